@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from flask import Flask
+from flask_compress import Compress
 from flask_cors import CORS
 
-from app.api.routes import api_bp
+from app.api.routes import api_bp, ocr_pool
 from app.config import Config
 
 
@@ -11,6 +12,14 @@ def create_app() -> Flask:
     app = Flask(__name__)
     app.config.from_object(Config)
     CORS(app)  # ok for MVP; tighten later
+    Compress(app)
+
+    # OCR is CPU-heavy and runs out of process; the pool is created on first upload.
+    if app.config["OCR_PRELOAD"]:
+        pool = ocr_pool(app)
+        if pool is not None:
+            # Any submission starts the workers, which warm up via the initializer.
+            pool.submit(int)
 
     app.register_blueprint(api_bp)
     return app
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
 import io
 import mimetypes
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Dict
+from typing import Any, Dict, KeysView, Sequence
 
-from flask import Blueprint, current_app, jsonify, request, send_file
+import orjson
+from flask import Blueprint, Flask, current_app, request, send_file
+from werkzeug.exceptions import RequestEntityTooLarge
 
 from app.repositories.repository import (
     ItemAllocation,
@@ -13,9 +24,8 @@ from app.repositories.repository import (
     RepositoryNotFoundError,
     SplitItRepository,
 )
-from app.domain.split_logic import SplitLogicError, split_cents_fair_remainder
-from app.services import ocr_service
-from app.services.receipt_parser import ReceiptParseError, extract_items_from_ocr_text
+from app.domain.split_logic import fair_remainder_amounts
+from app.services.receipt_parser import ParsedItem, ReceiptParseError, extract_items_from_ocr_text
 from app.api.validators import (
     ApiValidationError,
     is_uuid,
@@ -28,13 +38,149 @@ from app.api.validators import (
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
+# Parsed items keyed by image digest, so re-uploads of the same receipt skip OCR.
+_OCR_CACHE_MAX = 512
+_OCR_CACHE: OrderedDict[bytes, tuple[ParsedItem, ...]] = OrderedDict()
+_OCR_CACHE_LOCK = threading.Lock()
+_OCR_POOL_LOCK = threading.Lock()
+
+
+def _json_ok(payload: Any, *, status: int = 200):
+    return current_app.response_class(orjson.dumps(payload), status=status, mimetype="application/json")
+
 
 def _json_error(message: str, *, status: int = 400, code: str = "bad_request"):
-    return jsonify({"error": {"code": code, "message": message}}), status
+    # Codes are fixed snake_case identifiers, so only the message needs JSON escaping.
+    body = b'{"error":{"code":"%s","message":%s}}' % (code.encode(), orjson.dumps(message))
+    return current_app.response_class(body, status=status, mimetype="application/json")
+
+
+def _request_json() -> Any:
+    if not request.is_json:
+        return None
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
 
 
 def _repo() -> SplitItRepository:
-    return SplitItRepository(current_app.config.get("DATABASE_URL", ""))
+    app = current_app._get_current_object()
+    repo = app.extensions.get("splitit_repo")
+    if repo is None:
+        repo = SplitItRepository(
+            app.config.get("DATABASE_URL", ""),
+            pool_max_size=app.config.get("DB_POOL_MAX_SIZE", 10),
+            prepare_threshold=app.config.get("DB_PREPARE_THRESHOLD", 1),
+        )
+        # Return pooled connections cleanly instead of dropping them at interpreter exit.
+        atexit.register(repo.close)
+        app.extensions["splitit_repo"] = repo
+    return repo
+
+
+def ocr_pool(app: Flask) -> ProcessPoolExecutor | None:
+    """
+    This process's OCR pool for the app, created on first use.
+
+    Returns None when OCR_MAX_WORKERS is 0 (or unset), meaning OCR runs in the
+    request thread. A pool inherited from a parent process (e.g. a pre-fork
+    server master) has no manager thread here, so it is replaced, not reused.
+    """
+    entry = app.extensions.get("ocr_pool")
+    if entry is not None and entry[0] == os.getpid():
+        return entry[1]
+    max_workers = app.config.get("OCR_MAX_WORKERS", 0)
+    if max_workers <= 0:
+        return None
+
+    # Imported on first use: EasyOCR pulls in torch, which no other endpoint needs.
+    from app.services import ocr_service
+
+    with _OCR_POOL_LOCK:
+        entry = app.extensions.get("ocr_pool")
+        if entry is None or entry[0] != os.getpid():
+            # Spawned, not forked: this process already runs threads (the DB pool,
+            # the threaded dev server), and a forked child can inherit a held lock.
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=ocr_service.warm_up,
+            )
+            entry = (os.getpid(), pool)
+            app.extensions["ocr_pool"] = entry
+    return entry[1]
+
+
+def _discard_ocr_pool(app: Flask, broken: Any) -> None:
+    with _OCR_POOL_LOCK:
+        entry = app.extensions.get("ocr_pool")
+        if entry is not None and entry[1] is broken:
+            del app.extensions["ocr_pool"]
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _ocr_in_pool(pool: Any, image_bytes: bytes, timeout: float) -> str:
+    from app.services import ocr_service
+
+    future = pool.submit(ocr_service.run_ocr, image_bytes)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        # Drop the job if it is still queued; a running one can't be interrupted.
+        future.cancel()
+        raise
+
+
+def _run_ocr(image_bytes: bytes) -> str:
+    app = current_app._get_current_object()
+    pool = ocr_pool(app)
+    if pool is None:
+        from app.services import ocr_service
+
+        return ocr_service.run_ocr(image_bytes)
+
+    timeout = app.config.get("OCR_TIMEOUT_SECONDS", 30)
+    try:
+        return _ocr_in_pool(pool, image_bytes, timeout)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed): swap in a fresh pool and retry once.
+        _discard_ocr_pool(app, pool)
+        return _ocr_in_pool(ocr_pool(app), image_bytes, timeout)
+
+
+def _parse_receipt_image(image_bytes: bytes) -> tuple[ParsedItem, ...]:
+    digest = hashlib.blake2b(image_bytes, digest_size=32).digest()
+    with _OCR_CACHE_LOCK:
+        cached = _OCR_CACHE.get(digest)
+        if cached is not None:
+            _OCR_CACHE.move_to_end(digest)
+            return cached
+
+    parsed_items = tuple(extract_items_from_ocr_text(_run_ocr(image_bytes)))
+
+    with _OCR_CACHE_LOCK:
+        _OCR_CACHE[digest] = parsed_items
+        if len(_OCR_CACHE) > _OCR_CACHE_MAX:
+            _OCR_CACHE.popitem(last=False)
+    return parsed_items
+
+
+def _assigned_participants_error(item_id: str, selected: list, request_participant_ids: KeysView[str]) -> str:
+    seen_selected: set[str] = set()
+    for selected_pid in selected:
+        if not isinstance(selected_pid, str):
+            return f"Assignment for item {item_id} contains invalid participant id."
+        if selected_pid not in request_participant_ids:
+            # Request participants are already validated UUIDs, so only ids
+            # outside that set need the format check to pick the error.
+            if not is_uuid(selected_pid):
+                return f"Assignment for item {item_id} contains invalid participant id."
+            return f"Assignment for item {item_id} references participant not in request 'participants'."
+        if selected_pid in seen_selected:
+            return f"Assignment for item {item_id} contains duplicate participant ids."
+        seen_selected.add(selected_pid)
+    return f"Assignment for item {item_id} contains invalid participant id."
 
 
 def _isoformat(value: datetime) -> str:
@@ -87,9 +233,14 @@ def _guess_image_mimetype(image_bytes: bytes, image_path: str | None = None) ->
     return "application/octet-stream"
 
 
+@api_bp.errorhandler(RequestEntityTooLarge)
+def _request_too_large(_exc: RequestEntityTooLarge):
+    return _json_error("Uploaded file is too large.", status=413, code="payload_too_large")
+
+
 @api_bp.get("/health")
 def health():
-    return jsonify({"status": "ok"}), 200
+    return _json_ok({"status": "ok"})
 
 
 @api_bp.post("/receipts")
@@ -121,25 +272,23 @@ def create_receipt_from_image():
         return _json_error("Failed to persist receipt image.", status=500, code="db_error")
 
     try:
-        ocr_text = ocr_service.run_ocr(image_bytes)
-        parsed_items = extract_items_from_ocr_text(ocr_text)
+        parsed_items = _parse_receipt_image(image_bytes)
     except Exception as exc:
+        if isinstance(exc, FutureTimeoutError):
+            return _json_error("OCR timed out.", status=504, code="ocr_timeout")
         if isinstance(exc, ReceiptParseError):
             return _json_error("Failed to parse receipt text.", status=422, code="parse_failed")
         return _json_error("OCR failed.", status=500, code="ocr_failed")
 
-    return (
-        jsonify(
-            {
-                "receipt_image_id": receipt_image_id,
-                "currency": "USD",
-                "items": [
-                    {"temp_id": f"t{idx}", "description": item.description, "price_cents": item.price_cents}
-                    for idx, item in enumerate(parsed_items)
-                ],
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "receipt_image_id": receipt_image_id,
+            "currency": "USD",
+            "items": [
+                {"temp_id": f"t{idx}", "description": item.description, "price_cents": item.price_cents}
+                for idx, item in enumerate(parsed_items)
+            ],
+        }
     )
 
 
@@ -148,7 +297,7 @@ def replace_receipt_items(receipt_image_id: str):
     if not is_uuid(receipt_image_id):
         return _json_error("Invalid receipt_image_id.", status=400)
 
-    data = request.get_json(silent=True)
+    data = _request_json()
     if data is None:
         return _json_error("Request body must be JSON.", status=400)
 
@@ -166,17 +315,13 @@ def replace_receipt_items(receipt_image_id: str):
     except Exception:
         return _json_error("Failed to persist receipt items.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "receipt_image_id": receipt_image_id,
-                "items": [
-                    {"id": item.id, "description": item.description, "price_cents": item.price_cents}
-                    for item in inserted
-                ],
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "receipt_image_id": receipt_image_id,
+            # ReceiptItemRecord's fields are exactly the response shape; orjson
+            # serializes the dataclasses directly.
+            "items": inserted,
+        }
     )
 
 
@@ -191,22 +336,19 @@ def list_bills():
     except Exception:
         return _json_error("Failed to fetch bills.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "bills": [
-                    {
-                        "receipt_image_id": preview.receipt_image_id,
-                        "bill_description": preview.bill_description,
-                        "entered_at": _isoformat(preview.entered_at),
-                        "has_image": preview.has_image,
-                        "preview_image_url": f"/api/receipts/{preview.receipt_image_id}/image",
-                    }
-                    for preview in previews
-                ]
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "bills": [
+                {
+                    "receipt_image_id": preview.receipt_image_id,
+                    "bill_description": preview.bill_description,
+                    "entered_at": _isoformat(preview.entered_at),
+                    "has_image": preview.has_image,
+                    "preview_image_url": f"/api/receipts/{preview.receipt_image_id}/image",
+                }
+                for preview in previews
+            ]
+        }
     )
 
 
@@ -227,34 +369,31 @@ def get_bill_split_details(receipt_image_id: str):
     if details is None:
         return _json_error("Bill not found.", status=404, code="not_found")
 
-    return (
-        jsonify(
-            {
-                "receipt_image_id": details.receipt_image_id,
-                "bill_description": details.bill_description,
-                "entered_at": _isoformat(details.entered_at),
-                "bill_total_cents": details.bill_total_cents,
-                "has_image": details.has_image,
-                "show_bill_image_url": f"/api/receipts/{details.receipt_image_id}/image",
-                "participants": [
-                    {
-                        "participant_id": participant.participant_id,
-                        "participant_name": participant.participant_name,
-                        "participant_total_cents": participant.participant_total_cents,
-                        "lines": [
-                            {
-                                "receipt_item_id": line.receipt_item_id,
-                                "item_description": line.item_description,
-                                "amount_cents": line.amount_cents,
-                            }
-                            for line in participant.lines
-                        ],
-                    }
-                    for participant in details.participants
-                ],
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "receipt_image_id": details.receipt_image_id,
+            "bill_description": details.bill_description,
+            "entered_at": _isoformat(details.entered_at),
+            "bill_total_cents": details.bill_total_cents,
+            "has_image": details.has_image,
+            "show_bill_image_url": f"/api/receipts/{details.receipt_image_id}/image",
+            "participants": [
+                {
+                    "participant_id": participant.participant_id,
+                    "participant_name": participant.participant_name,
+                    "participant_total_cents": participant.participant_total_cents,
+                    "lines": [
+                        {
+                            "receipt_item_id": line.receipt_item_id,
+                            "item_description": line.item_description,
+                            "amount_cents": line.amount_cents,
+                        }
+                        for line in participant.lines
+                    ],
+                }
+                for participant in details.participants
+            ],
+        }
     )
 
 
@@ -302,20 +441,17 @@ def list_participants():
     except Exception:
         return _json_error("Failed to fetch participants.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "participants": [
-                    {
-                        "id": participant.id,
-                        "display_name": participant.display_name,
-                        "running_total_cents": participant.running_total_cents,
-                    }
-                    for participant in participants
-                ]
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "participants": [
+                {
+                    "id": participant.id,
+                    "display_name": participant.display_name,
+                    "running_total_cents": participant.running_total_cents,
+                }
+                for participant in participants
+            ]
+        }
     )
 
 
@@ -326,7 +462,7 @@ def get_running_balances():
         return _json_error("DATABASE_URL is not configured.", status=503, code="db_unavailable")
 
     try:
-        participants = repo.list_running_balance_participants()
+        participants = repo.list_running_balance_participants_raw()
     except Exception:
         current_app.logger.exception("Failed to fetch running balance activity.")
         return _json_error(
@@ -347,29 +483,10 @@ def get_running_balances():
 
     summary_by_participant_id = {summary.participant_id: summary for summary in folio_summaries}
     response_participants = []
+    # Bills and events arrive already grouped and shaped like the payload.
     for participant in participants:
-        bills: Dict[str, dict] = {}
-        active_cycle_charged_cents = 0
-        summary = summary_by_participant_id.get(participant.participant_id)
-
-        for line in participant.lines:
-            if line.receipt_id not in bills:
-                bills[line.receipt_id] = {
-                    "receipt_id": line.receipt_id,
-                    "bill_description": line.bill_description,
-                    "bill_total_cents": 0,
-                    "lines": [],
-                }
-
-            bills[line.receipt_id]["lines"].append(
-                {
-                    "receipt_item_id": line.receipt_item_id,
-                    "item_name": line.item_name,
-                    "contribution_cents": line.contribution_cents,
-                }
-            )
-            bills[line.receipt_id]["bill_total_cents"] += line.contribution_cents
-            active_cycle_charged_cents += line.contribution_cents
+        active_cycle_charged_cents = participant["active_cycle_charged_cents"]
+        summary = summary_by_participant_id.get(participant["participant_id"])
 
         participant_net_balance_cents = summary.net_balance_cents if summary else active_cycle_charged_cents
         participant_status = (
@@ -380,37 +497,21 @@ def get_running_balances():
 
         response_participants.append(
             {
-                "participant_id": participant.participant_id,
-                "participant_name": participant.participant_name,
+                "participant_id": participant["participant_id"],
+                "participant_name": participant["participant_name"],
                 "participant_total_cents": participant_net_balance_cents,
                 "total_charged_cents": summary.total_charged_cents if summary else active_cycle_charged_cents,
                 "total_settled_cents": summary.total_settled_cents if summary else 0,
                 "total_repaid_cents": summary.total_repaid_cents if summary else 0,
                 "net_balance_cents": participant_net_balance_cents,
                 "status": participant_status,
-                "bills": list(bills.values()),
-                "settlement_events": [
-                    {
-                        "event_id": event.event_id,
-                        "event_at": _isoformat(event.event_at),
-                        "amount_cents": event.amount_cents,
-                        "reference_details": event.reference_details,
-                    }
-                    for event in participant.settlement_events
-                ],
-                "repayment_events": [
-                    {
-                        "event_id": event.event_id,
-                        "event_at": _isoformat(event.event_at),
-                        "amount_cents": event.amount_cents,
-                        "reference_details": event.reference_details,
-                    }
-                    for event in participant.repayment_events
-                ],
+                "bills": participant["bills"],
+                "settlement_events": participant["settlement_events"],
+                "repayment_events": participant["repayment_events"],
             }
         )
 
-    return jsonify({"participants": response_participants}), 200
+    return _json_ok({"participants": response_participants})
 
 
 @api_bp.get("/participants/folios")
@@ -424,7 +525,7 @@ def list_participant_folios():
     except Exception:
         return _json_error("Failed to fetch participant folios.", status=500, code="db_error")
 
-    return jsonify({"folios": [_folio_summary_payload(summary) for summary in summaries]}), 200
+    return _json_ok({"folios": [_folio_summary_payload(summary) for summary in summaries]})
 
 
 @api_bp.get("/participants/<participant_id>/folio")
@@ -452,16 +553,13 @@ def get_participant_folio(participant_id: str):
     except Exception:
         return _json_error("Failed to fetch participant folio.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                **_folio_summary_payload(folio.summary),
-                "charge_events": [_folio_event_payload(event) for event in folio.charge_events],
-                "settlement_events": [_folio_event_payload(event) for event in folio.settlement_events],
-                "repayment_events": [_folio_event_payload(event) for event in folio.repayment_events],
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            **_folio_summary_payload(folio.summary),
+            "charge_events": [_folio_event_payload(event) for event in folio.charge_events],
+            "settlement_events": [_folio_event_payload(event) for event in folio.settlement_events],
+            "repayment_events": [_folio_event_payload(event) for event in folio.repayment_events],
+        }
     )
 
 
@@ -476,29 +574,26 @@ def get_folio_reconciliation():
     except Exception:
         return _json_error("Failed to run folio reconciliation.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "mismatch_count": len(mismatches),
-                "mismatches": [
-                    {
-                        "participant_id": mismatch.participant_id,
-                        "display_name": mismatch.display_name,
-                        "cached_net_balance_cents": mismatch.cached_net_balance_cents,
-                        "computed_net_balance_cents": mismatch.computed_net_balance_cents,
-                        "delta_cents": mismatch.delta_cents,
-                    }
-                    for mismatch in mismatches
-                ],
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "mismatch_count": len(mismatches),
+            "mismatches": [
+                {
+                    "participant_id": mismatch.participant_id,
+                    "display_name": mismatch.display_name,
+                    "cached_net_balance_cents": mismatch.cached_net_balance_cents,
+                    "computed_net_balance_cents": mismatch.computed_net_balance_cents,
+                    "delta_cents": mismatch.delta_cents,
+                }
+                for mismatch in mismatches
+            ],
+        }
     )
 
 
 @api_bp.post("/participants")
 def create_participant():
-    data = request.get_json(silent=True)
+    data = _request_json()
     if data is None:
         return _json_error("Request body must be JSON.", status=400)
 
@@ -515,15 +610,12 @@ def create_participant():
     except Exception:
         return _json_error("Failed to persist participant.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "id": participant.id,
-                "display_name": participant.display_name,
-                "running_total_cents": participant.running_total_cents,
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "id": participant.id,
+            "display_name": participant.display_name,
+            "running_total_cents": participant.running_total_cents,
+        }
     )
 
 
@@ -551,7 +643,7 @@ def delete_participant(participant_id: str):
     if not deleted:
         return _json_error("Participant not found.", status=404, code="not_found")
 
-    return jsonify({"deleted": True}), 200
+    return _json_ok({"deleted": True})
 
 
 @api_bp.post("/participants/<participant_id>/settlements")
@@ -559,7 +651,7 @@ def create_participant_settlement(participant_id: str):
     if not is_uuid(participant_id):
         return _json_error("Invalid participant_id.", status=400)
 
-    data = request.get_json(silent=True)
+    data = _request_json()
     if data is None:
         return _json_error("Request body must be JSON.", status=400)
 
@@ -596,22 +688,19 @@ def create_participant_settlement(participant_id: str):
     except Exception:
         return _json_error("Failed to create settlement.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "transaction_type": "settlement",
-                "settlement_id": result.settlement_id,
-                "previous_net_balance_cents": result.previous_net_balance_cents,
-                "payment_amount_cents": result.settlement_amount_cents,
-                "settlement_amount_cents": result.settlement_amount_cents,
-                "new_net_balance_cents": result.new_net_balance_cents,
-                "status": result.status,
-                "overpayment_cents": result.overpayment_cents,
-                "overpayment_happened": result.overpayment_cents > 0,
-                "idempotency_replayed": result.idempotency_replayed,
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "transaction_type": "settlement",
+            "settlement_id": result.settlement_id,
+            "previous_net_balance_cents": result.previous_net_balance_cents,
+            "payment_amount_cents": result.settlement_amount_cents,
+            "settlement_amount_cents": result.settlement_amount_cents,
+            "new_net_balance_cents": result.new_net_balance_cents,
+            "status": result.status,
+            "overpayment_cents": result.overpayment_cents,
+            "overpayment_happened": result.overpayment_cents > 0,
+            "idempotency_replayed": result.idempotency_replayed,
+        }
     )
 
 
@@ -620,7 +709,7 @@ def create_participant_repayment(participant_id: str):
     if not is_uuid(participant_id):
         return _json_error("Invalid participant_id.", status=400)
 
-    data = request.get_json(silent=True)
+    data = _request_json()
     if data is None:
         return _json_error("Request body must be JSON.", status=400)
 
@@ -657,20 +746,17 @@ def create_participant_repayment(participant_id: str):
     except Exception:
         return _json_error("Failed to create repayment.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "transaction_type": "repayment",
-                "repayment_id": result.repayment_id,
-                "previous_net_balance_cents": result.previous_net_balance_cents,
-                "repayment_amount_cents": result.repayment_amount_cents,
-                "new_net_balance_cents": result.new_net_balance_cents,
-                "status": result.status,
-                "overpayment_cents": result.overpayment_cents,
-                "idempotency_replayed": result.idempotency_replayed,
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "transaction_type": "repayment",
+            "repayment_id": result.repayment_id,
+            "previous_net_balance_cents": result.previous_net_balance_cents,
+            "repayment_amount_cents": result.repayment_amount_cents,
+            "new_net_balance_cents": result.new_net_balance_cents,
+            "status": result.status,
+            "overpayment_cents": result.overpayment_cents,
+            "idempotency_replayed": result.idempotency_replayed,
+        }
     )
 
 
@@ -681,7 +767,7 @@ def reverse_participant_settlement(participant_id: str, settlement_id: str):
     if not is_uuid(settlement_id):
         return _json_error("Invalid settlement_id.", status=400)
 
-    data = request.get_json(silent=True) or {}
+    data = _request_json() or {}
 
     try:
         reversal_note = parse_optional_string(data.get("note"), field_name="note", max_len=500)
@@ -705,20 +791,17 @@ def reverse_participant_settlement(participant_id: str, settlement_id: str):
     except Exception:
         return _json_error("Failed to reverse settlement.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "transaction_type": "settlement_reversal",
-                "settlement_id": result.settlement_id,
-                "previous_net_balance_cents": result.previous_net_balance_cents,
-                "reversed_settlement_amount_cents": result.reversed_settlement_amount_cents,
-                "new_net_balance_cents": result.new_net_balance_cents,
-                "status": result.status,
-                "overpayment_cents": result.overpayment_cents,
-                "reversal_applied": result.reversal_applied,
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "transaction_type": "settlement_reversal",
+            "settlement_id": result.settlement_id,
+            "previous_net_balance_cents": result.previous_net_balance_cents,
+            "reversed_settlement_amount_cents": result.reversed_settlement_amount_cents,
+            "new_net_balance_cents": result.new_net_balance_cents,
+            "status": result.status,
+            "overpayment_cents": result.overpayment_cents,
+            "reversal_applied": result.reversal_applied,
+        }
     )
 
 
@@ -729,7 +812,7 @@ def reverse_participant_repayment(participant_id: str, repayment_id: str):
     if not is_uuid(repayment_id):
         return _json_error("Invalid repayment_id.", status=400)
 
-    data = request.get_json(silent=True) or {}
+    data = _request_json() or {}
 
     try:
         reversal_note = parse_optional_string(data.get("note"), field_name="note", max_len=500)
@@ -753,20 +836,17 @@ def reverse_participant_repayment(participant_id: str, repayment_id: str):
     except Exception:
         return _json_error("Failed to reverse repayment.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "transaction_type": "repayment_reversal",
-                "repayment_id": result.repayment_id,
-                "previous_net_balance_cents": result.previous_net_balance_cents,
-                "reversed_repayment_amount_cents": result.reversed_repayment_amount_cents,
-                "new_net_balance_cents": result.new_net_balance_cents,
-                "status": result.status,
-                "overpayment_cents": result.overpayment_cents,
-                "reversal_applied": result.reversal_applied,
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "transaction_type": "repayment_reversal",
+            "repayment_id": result.repayment_id,
+            "previous_net_balance_cents": result.previous_net_balance_cents,
+            "reversed_repayment_amount_cents": result.reversed_repayment_amount_cents,
+            "new_net_balance_cents": result.new_net_balance_cents,
+            "status": result.status,
+            "overpayment_cents": result.overpayment_cents,
+            "reversal_applied": result.reversal_applied,
+        }
     )
 
 
@@ -784,39 +864,17 @@ def get_participant_ledger(participant_id: str):
         if not participant:
             return _json_error("Participant not found.", status=404, code="not_found")
 
-        ledger_lines = repo.get_participant_ledger_lines(participant_id=participant_id)
+        # Bills arrive grouped and ordered newest receipt first, already shaped like the payload.
+        computed_total_cents, bills = repo.get_participant_ledger_bills_raw(participant_id=participant_id)
     except Exception:
         return _json_error("Failed to fetch participant ledger.", status=500, code="db_error")
 
-    bill_groups: Dict[str, dict] = {}
-    computed_total_cents = 0
-
-    for line in ledger_lines:
-        if line.receipt_image_id not in bill_groups:
-            bill_groups[line.receipt_image_id] = {
-                "receipt_image_id": line.receipt_image_id,
-                "bill_description": line.bill_description,
-                "lines": [],
-            }
-
-        bill_groups[line.receipt_image_id]["lines"].append(
-            {
-                "receipt_item_id": line.receipt_item_id,
-                "item_description": line.item_description,
-                "amount_cents": line.amount_cents,
-            }
-        )
-        computed_total_cents += line.amount_cents
-
-    return (
-        jsonify(
-            {
-                "participant_id": participant_id,
-                "computed_total_cents": computed_total_cents,
-                "bills": list(bill_groups.values()),
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "participant_id": participant_id,
+            "computed_total_cents": computed_total_cents,
+            "bills": bills,
+        }
     )
 
 
@@ -825,7 +883,7 @@ def split_receipt(receipt_image_id: str):
     if not is_uuid(receipt_image_id):
         return _json_error("Invalid receipt_image_id.", status=400)
 
-    data = request.get_json(silent=True)
+    data = _request_json()
     if data is None:
         return _json_error("Request body must be JSON.", status=400)
 
@@ -834,7 +892,7 @@ def split_receipt(receipt_image_id: str):
         return _json_error("'assignments' must be an object mapping receipt_item_id -> participant_ids.", status=400)
 
     try:
-        participant_ids = parse_unique_participant_ids(data.get("participants"))
+        participant_order = parse_unique_participant_ids(data.get("participants"))
     except ApiValidationError as exc:
         return _json_error(str(exc), status=400)
 
@@ -847,76 +905,91 @@ def split_receipt(receipt_image_id: str):
     except Exception:
         return _json_error("Failed to fetch receipt items.", status=500, code="db_error")
 
-    items_by_id = {item.id: item for item in receipt_items}
-    if not items_by_id:
-        return _json_error("No persisted receipt items found for this receipt.", status=400)
+    item_ids: list[str] = []
+    item_prices: list[int] = []
+    for item in receipt_items:
+        item_ids.append(item.id)
+        item_prices.append(item.price_cents)
 
-    for assigned_item_id in assignments:
-        if assigned_item_id not in items_by_id:
-            return _json_error(f"Assignment references unknown item id for this receipt: {assigned_item_id}", status=400)
+    if not item_ids:
+        return _json_error("No persisted receipt items found for this receipt.", status=400)
 
-    for item_id in items_by_id:
-        pids = assignments.get(item_id)
-        if not isinstance(pids, list) or not pids:
+    # A keys-view difference accepts any iterable, so no set of item ids is built.
+    unknown_item_ids = assignments.keys() - item_ids
+    if unknown_item_ids:
+        # Report the first unknown id in request order, not set iteration order.
+        unknown_item_id = next(item_id for item_id in assignments if item_id in unknown_item_ids)
+        return _json_error(f"Assignment references unknown item id for this receipt: {unknown_item_id}", status=400)
+    # Shape errors are reported before the participant lookup can fail the request.
+    for item_id in item_ids:
+        selected = assignments.get(item_id)
+        if not isinstance(selected, list) or not selected:
             return _json_error(f"Assignment for item {item_id} must be a non-empty list.", status=400)
 
     try:
-        db_participants = repo.get_participants_by_ids(participant_ids=participant_ids)
+        db_participants = repo.get_participants_by_ids(participant_ids=list(participant_order))
     except Exception:
         return _json_error("Failed to fetch participants.", status=500, code="db_error")
 
     db_participant_ids = {participant.id for participant in db_participants}
-    if db_participant_ids != set(participant_ids):
+    request_participant_ids = participant_order.keys()
+    if db_participant_ids != request_participant_ids:
         return _json_error("One or more participant ids do not exist.", status=400)
 
-    totals_by_participant_id: Dict[str, int] = {pid: 0 for pid in participant_ids}
-    participant_order = {pid: idx for idx, pid in enumerate(participant_ids)}
+    totals_by_participant_id: Dict[str, int] = dict.fromkeys(participant_order, 0)
     allocations: list[ItemAllocation] = []
+    append_allocation = allocations.append
     grand_total_cents = 0
+    allocated_total_cents = 0
 
-    for item in receipt_items:
-        selected = assignments[item.id]
-        seen_selected: set[str] = set()
-        for selected_pid in selected:
-            if not isinstance(selected_pid, str) or not is_uuid(selected_pid):
-                return _json_error(f"Assignment for item {item.id} contains invalid participant id.", status=400)
-            if selected_pid in seen_selected:
-                return _json_error(f"Assignment for item {item.id} contains duplicate participant ids.", status=400)
-            if selected_pid not in totals_by_participant_id:
-                return _json_error(f"Assignment for item {item.id} references participant not in request 'participants'.", status=400)
-            seen_selected.add(selected_pid)
-
-        grand_total_cents += item.price_cents
+    for item_id, item_price_cents in zip(item_ids, item_prices):
+        selected = assignments[item_id]
 
+        # One C-level set build covers the common all-valid case; the per-id walk
+        # only runs to pick the error message.
         try:
-            split_result = split_cents_fair_remainder(
-                item.price_cents,
+            selected_set = set(selected)
+        except TypeError:
+            selected_set = None
+        if (
+            selected_set is None
+            or len(selected_set) != len(selected)
+            or not selected_set <= request_participant_ids
+        ):
+            return _json_error(_assigned_participants_error(item_id, selected, request_participant_ids), status=400)
+
+        if item_price_cents < 0:
+            return _json_error("total_cents must be >= 0", status=422, code="split_failed")
+
+        grand_total_cents += item_price_cents
+
+        share_cents, remainder_cents = divmod(item_price_cents, len(selected))
+        if remainder_cents == 0:
+            # Even split: there are no remainder cents to place by running totals.
+            split_amounts: Sequence[int] = (share_cents,) * len(selected)
+        else:
+            # Inputs are validated above, so skip the splitter's own checks and Allocation wrapper.
+            split_amounts = fair_remainder_amounts(
+                item_price_cents,
                 selected,
                 totals_by_participant_id,
                 participant_order,
             )
-        except SplitLogicError as exc:
-            return _json_error(str(exc), status=422, code="split_failed")
-
-        item_sum = sum(split_result.amounts_cents)
-        if item_sum != item.price_cents:
-            return _json_error(
-                f"Split allocations for item {item.id} do not sum to item price.",
-                status=422,
-                code="split_sum_mismatch",
-            )
 
-        for selected_pid, amount_cents in zip(split_result.participants, split_result.amounts_cents, strict=True):
+        # Both splits return one amount per selected id, so no strict zip is needed;
+        # the allocated_total_cents check after the loop still guards the sums.
+        for selected_pid, amount_cents in zip(selected, split_amounts):
             totals_by_participant_id[selected_pid] += amount_cents
-            allocations.append(
+            allocated_total_cents += amount_cents
+            append_allocation(
                 ItemAllocation(
                     participant_id=selected_pid,
-                    receipt_item_id=item.id,
+                    receipt_item_id=item_id,
                     amount_cents=amount_cents,
                 )
             )
 
-    if sum(totals_by_participant_id.values()) != grand_total_cents:
+    if allocated_total_cents != grand_total_cents:
         return _json_error("Internal error: totals do not sum to grand total.", status=500, code="internal_mismatch")
 
     try:
@@ -924,28 +997,19 @@ def split_receipt(receipt_image_id: str):
     except Exception:
         return _json_error("Failed to persist allocations.", status=500, code="db_error")
 
-    return (
-        jsonify(
-            {
-                "receipt_image_id": receipt_image_id,
-                "grand_total_cents": grand_total_cents,
-                "totals_by_participant_id": totals_by_participant_id,
-                "receipt_items": [
-                    {
-                        "id": item.id,
-                        "description": item.description,
-                    }
-                    for item in receipt_items
-                ],
-                "allocations": [
-                    {
-                        "participant_id": allocation.participant_id,
-                        "receipt_item_id": allocation.receipt_item_id,
-                        "amount_cents": allocation.amount_cents,
-                    }
-                    for allocation in allocations
-                ],
-            }
-        ),
-        200,
+    return _json_ok(
+        {
+            "receipt_image_id": receipt_image_id,
+            "grand_total_cents": grand_total_cents,
+            "totals_by_participant_id": totals_by_participant_id,
+            "receipt_items": [
+                {
+                    "id": item.id,
+                    "description": item.description,
+                }
+                for item in receipt_items
+            ],
+            # ItemAllocation's fields are the response shape; orjson serializes them as-is.
+            "allocations": allocations,
+        }
     )
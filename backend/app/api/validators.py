@@ -1,22 +1,21 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime
-from typing import List
-from uuid import UUID
+from typing import Dict
 
 from app.services.receipt_parser import ParsedItem
 
+# Canonical hyphenated form only; this is what the DB returns via id::text.
+_UUID_RE = re.compile(r"\A[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\Z")
+
 
 class ApiValidationError(ValueError):
     """Raised when request payload validation fails."""
 
 
 def is_uuid(value: str) -> bool:
-    try:
-        UUID(value)
-    except (ValueError, TypeError):
-        return False
-    return True
+    return isinstance(value, str) and len(value) == 36 and _UUID_RE.match(value) is not None
 
 
 def parse_receipt_items(raw_items: object) -> list[ParsedItem]:
@@ -31,7 +30,8 @@ def parse_receipt_items(raw_items: object) -> list[ParsedItem]:
         description = raw_item.get("description")
         price_cents = raw_item.get("price_cents")
 
-        if not isinstance(description, str) or not description.strip():
+        description = description.strip() if isinstance(description, str) else ""
+        if not description:
             raise ApiValidationError(
                 f"Item at index {idx} must include a non-empty 'description'."
             )
@@ -40,30 +40,27 @@ def parse_receipt_items(raw_items: object) -> list[ParsedItem]:
                 f"Item at index {idx} must include 'price_cents' as int >= 0."
             )
 
-        parsed_items.append(
-            ParsedItem(description=description.strip(), price_cents=price_cents)
-        )
+        parsed_items.append(ParsedItem(description=description, price_cents=price_cents))
 
     return parsed_items
 
 
-def parse_unique_participant_ids(raw_participants: object) -> List[str]:
+def parse_unique_participant_ids(raw_participants: object) -> Dict[str, int]:
+    """Return participant id -> position in the request, in request order."""
     if not isinstance(raw_participants, list) or not raw_participants:
         raise ApiValidationError(
             "'participants' must be a non-empty list of participant ids."
         )
 
-    participant_ids: List[str] = []
-    seen_participant_ids: set[str] = set()
+    participant_order: Dict[str, int] = {}
     for pid in raw_participants:
-        if not isinstance(pid, str) or not is_uuid(pid):
+        if not is_uuid(pid):
             raise ApiValidationError("Each participant id must be a valid UUID string.")
-        if pid in seen_participant_ids:
+        if pid in participant_order:
             raise ApiValidationError("Participant ids must be unique.")
-        seen_participant_ids.add(pid)
-        participant_ids.append(pid)
+        participant_order[pid] = len(participant_order)
 
-    return participant_ids
+    return participant_order
 
 
 def parse_positive_cents(raw_value: object, *, field_name: str = "amount_cents") -> int:
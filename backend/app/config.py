@@ -5,4 +5,25 @@ import os
 
 class Config:
     DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    # Server-side prepare each query from its second execution on a pooled connection.
+    DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "1"))
     RECEIPT_OWNER_ID = os.getenv("RECEIPT_OWNER_ID", "mvp-owner")
+    # Reject oversized uploads before Werkzeug spools them and we read them into memory.
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+    # Each OCR worker process loads its own EasyOCR model (and torch uses several
+    # threads per process), so keep this small. 0 runs OCR in the request thread.
+    OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", "2"))
+    # Start the OCR workers (and load their models) at app startup, not on the first
+    # upload. Off by default. Workers are per process, so a pre-fork master that
+    # preloads the app starts a pool its forked workers replace, not share.
+    OCR_PRELOAD = os.getenv("OCR_PRELOAD", "").strip().lower() in ("1", "true", "yes")
+    # Run EasyOCR on CUDA/MPS when available; EasyOCR falls back to CPU otherwise.
+    OCR_GPU = os.getenv("OCR_GPU", "").strip().lower() in ("1", "true", "yes")
+    # Longest image side fed to EasyOCR; its text detector resizes to 2560 anyway.
+    OCR_MAX_IMAGE_SIDE = int(os.getenv("OCR_MAX_IMAGE_SIDE", "2560"))
+    OCR_TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "30"))
+    # JSON responses (split totals, folios) compress well for mobile clients.
+    COMPRESS_ALGORITHM = ["br", "gzip"]
+    COMPRESS_MIMETYPES = ["application/json"]
+    COMPRESS_MIN_SIZE = 256
@@ -9,7 +9,7 @@ class ModelValidationError(ValueError):
     """Raised when request/response models fail basic validation."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Participant:
     """
     A person taking part in the split.
@@ -25,7 +25,7 @@ class Participant:
             raise ModelValidationError("Participant.name must be a non-empty string")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Item:
     """
     A receipt line item.
@@ -44,7 +44,7 @@ class Item:
             raise ModelValidationError("Item.price_cents must be an int >= 0")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SplitRequest:
     """
     Payload for /api/calculate.
@@ -85,7 +85,7 @@ class SplitRequest:
                     raise ModelValidationError(f"assignment references unknown participant id: {pid}")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SplitResult:
     """
     Output for /api/calculate.
@@ -109,9 +109,9 @@ class SplitResult:
             raise ModelValidationError("currency must be a non-empty string")
 
         for pid, cents in self.totals_by_participant_id.items():
-            if not isinstance(pid, str) or not pid.strip():
+            if type(pid) is not str or not pid.strip():
                 raise ModelValidationError("totals_by_participant_id keys must be non-empty strings")
-            if not isinstance(cents, int) or cents < 0:
+            if type(cents) is not int or cents < 0:
                 raise ModelValidationError("totals_by_participant_id values must be int >= 0")
 
         if self.breakdown_by_item_id is not None:
@@ -123,7 +123,7 @@ class SplitResult:
                 if not isinstance(per_person, dict):
                     raise ModelValidationError("breakdown values must be dicts")
                 for pid, cents in per_person.items():
-                    if not isinstance(pid, str) or not pid.strip():
+                    if type(pid) is not str or not pid.strip():
                         raise ModelValidationError("breakdown participant_id keys must be non-empty strings")
-                    if not isinstance(cents, int) or cents < 0:
+                    if type(cents) is not int or cents < 0:
                         raise ModelValidationError("breakdown cents must be int >= 0")
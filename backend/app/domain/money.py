@@ -4,13 +4,18 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 
 
 class MoneyError(ValueError):
     """Raised when currency/money parsing or formatting fails."""
 
 
+_DECIMAL_100 = Decimal(100)
+_DECIMAL_ONE = Decimal(1)
+
+
 @dataclass(frozen=True)
 class Money:
     """
@@ -28,7 +33,7 @@ class Money:
 
     @property
     def dollars(self) -> Decimal:
-        return Decimal(self.cents) / Decimal(100)
+        return Decimal(self.cents) / _DECIMAL_100
 
     def format(self, symbol: str = "$") -> str:
         """
@@ -45,7 +50,11 @@ class Money:
 # - Supports $ prefix, optional spaces, decimal "." or ","
 # - Supports trailing "-" meaning negative (common on receipts)
 # - Rejects thousands separators to avoid guessing ("1,234.56")
-_MONEY_TOKEN_RE = re.compile(r"^\s*\$?\s*(\d{1,7})([.,](\d{1,2}))?\s*(-)?\s*$")
+#
+# Accepted shape: [$] digits{1,7} [(.|,) digits{1,2}] [-], with optional
+# whitespace around "$" and "-". This is scanned with str methods rather than
+# a regex since it runs for every candidate receipt line.
+_THOUSANDS_SEP_RE = re.compile(r"\d,\d{3}")
 
 
 def parse_usd_to_cents(
@@ -73,44 +82,58 @@ def parse_usd_to_cents(
     if not isinstance(token, str):
         raise MoneyError("token must be a string")
 
+    total, negative = _parse_usd_token(token)
+    if negative and not allow_negative:
+        raise MoneyError("negative amounts are not allowed")
+
+    if abs(total) > max_abs_cents:
+        raise MoneyError("amount exceeds safety limit")
+
+    return total
+
+
+# Receipts repeat the same handful of prices; only successful parses are cached
+# (lru_cache doesn't store exceptions), so junk tokens can't flood it.
+@lru_cache(maxsize=4096)
+def _parse_usd_token(token: str) -> Tuple[int, bool]:
+    """Signed cents and trailing-dash flag for a token, before caller-specific limits."""
     s = token.strip()
     if s == "":
         raise MoneyError("token is empty")
 
     # Reject thousands separators like 1,234.56 or 1,234
-    if re.search(r"\d,\d{3}", s):
+    if "," in s and _THOUSANDS_SEP_RE.search(s):
         raise MoneyError(f"ambiguous thousands separator format: {token}")
 
-    m = _MONEY_TOKEN_RE.match(s)
-    if not m:
-        raise MoneyError(f"invalid money token: {token}")
+    trailing_dash = s[-1] == "-"
+    body = s[:-1].rstrip() if trailing_dash else s
+    if body[:1] == "$":
+        body = body[1:].lstrip()
 
-    whole = m.group(1)  # digits
-    dec_sep = m.group(2)  # like ".34" or ",34" or None
-    dec_digits = m.group(3)  # "34" or "3" or None
-    trailing_dash = m.group(4)  # "-" or None
+    whole, dec_sep, dec_digits = body.partition(".")
+    if not dec_sep:
+        whole, dec_sep, dec_digits = body.partition(",")
 
-    negative = bool(trailing_dash)
-    if negative and not allow_negative:
-        raise MoneyError("negative amounts are not allowed")
+    # isdecimal() is exactly the set of characters re's \d matches.
+    if not (whole.isdecimal() and len(whole) <= 7) or (
+        dec_sep and not (dec_digits.isdecimal() and len(dec_digits) <= 2)
+    ):
+        raise MoneyError(f"invalid money token: {token}")
 
     # Build cents from whole + decimal digits
     dollars = int(whole)
     cents = 0
-    if dec_digits is not None:
+    if dec_sep:
         if len(dec_digits) == 1:
             cents = int(dec_digits) * 10
         else:
             cents = int(dec_digits)
 
     total = dollars * 100 + cents
-    if negative:
+    if trailing_dash:
         total = -total
 
-    if abs(total) > max_abs_cents:
-        raise MoneyError("amount exceeds safety limit")
-
-    return total
+    return total, trailing_dash
 
 
 def cents_to_str(cents: int, *, symbol: str = "$") -> str:
@@ -143,7 +166,7 @@ def decimal_to_cents(
     except (InvalidOperation, ValueError) as e:
         raise MoneyError(f"invalid decimal value: {value}") from e
 
-    cents_decimal = (d * Decimal(100)).quantize(Decimal("1"), rounding=rounding)
+    cents_decimal = (d * _DECIMAL_100).quantize(_DECIMAL_ONE, rounding=rounding)
     cents = int(cents_decimal)
 
     if abs(cents) > max_abs_cents:
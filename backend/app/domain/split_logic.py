@@ -1,6 +1,7 @@
 # backend/app/domain/split_logic.py
 from __future__ import annotations
 
+import heapq
 from dataclasses import dataclass
 from typing import Dict, Iterable, List, Sequence, Tuple
 
@@ -9,7 +10,7 @@ class SplitLogicError(ValueError):
     """Raised when split inputs are invalid."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Allocation:
     """
     Allocation result for a single item split among selected participants.
@@ -21,16 +22,7 @@ class Allocation:
     amounts_cents: Tuple[int, ...]
 
 
-def split_cents_penny_perfect(total_cents: int, participants: Sequence[str]) -> Allocation:
-    """
-    Split an integer number of cents across participants using the MVP algorithm:
-
-      base = total_cents // m
-      remainder = total_cents % m
-      first 'remainder' participants get base + 1, rest get base
-
-    Returns an Allocation whose amounts align to the participants order.
-    """
+def _validate_split_shape(total_cents: int, participants: Sequence[str]) -> None:
     if not isinstance(total_cents, int):
         raise SplitLogicError("total_cents must be an int")
     if total_cents < 0:
@@ -42,31 +34,81 @@ def split_cents_penny_perfect(total_cents: int, participants: Sequence[str]) ->
     if len(participants) == 0:
         raise SplitLogicError("participants must contain at least 1 participant")
 
+
+def _validate_participant_id(p: str) -> None:
+    if not isinstance(p, str):
+        raise SplitLogicError("participant ids must be strings")
+    if p.strip() == "":
+        raise SplitLogicError("participant ids must be non-empty strings")
+
+
+def _validated_split_inputs(total_cents: int, participants: Sequence[str]) -> Tuple[str, ...]:
+    _validate_split_shape(total_cents, participants)
+
     # Ensure stable ordering and no empty ids
-    norm: List[str] = []
     for p in participants:
-        if not isinstance(p, str):
-            raise SplitLogicError("participant ids must be strings")
-        if p.strip() == "":
-            raise SplitLogicError("participant ids must be non-empty strings")
-        norm.append(p)
+        _validate_participant_id(p)
+    return tuple(participants)
+
+
+def split_cents_penny_perfect(total_cents: int, participants: Sequence[str]) -> Allocation:
+    """
+    Split an integer number of cents across participants using the MVP algorithm:
+
+      base = total_cents // m
+      remainder = total_cents % m
+      first 'remainder' participants get base + 1, rest get base
+
+    Returns an Allocation whose amounts align to the participants order.
+    """
+    norm = _validated_split_inputs(total_cents, participants)
 
     m = len(norm)
     base = total_cents // m
     remainder = total_cents % m
 
-    amounts = [base + 1 if i < remainder else base for i in range(m)]
-    # Safety: ensure penny-perfect sum
-    if sum(amounts) != total_cents:
-        raise SplitLogicError("internal error: allocation does not sum to total")
+    # Penny-perfect by construction: base * m + remainder == total_cents.
+    amounts = [base + 1] * remainder + [base] * (m - remainder)
 
     return Allocation(
         total_cents=total_cents,
-        participants=tuple(norm),
+        participants=norm,
         amounts_cents=tuple(amounts),
     )
 
 
+def fair_remainder_amounts(
+    total_cents: int,
+    participants: Sequence[str],
+    running_totals: Dict[str, int],
+    participant_order: Dict[str, int],
+) -> List[int]:
+    """
+    Amounts for split_cents_fair_remainder without input validation.
+
+    For callers that have already checked total_cents is a non-negative int and
+    participants is a non-empty sequence of distinct ids present in
+    participant_order. Amounts align to the participants order.
+    """
+    m = len(participants)
+    base, remainder = divmod(total_cents, m)
+
+    amounts = [base] * m
+    if remainder:
+        # Heap of (simulated total, order, index): each remainder cent pops the
+        # current minimum instead of rescanning every selected participant.
+        heap = [
+            (running_totals.get(pid, 0) + base, participant_order[pid], idx)
+            for idx, pid in enumerate(participants)
+        ]
+        heapq.heapify(heap)
+        for _ in range(remainder):
+            simulated_total, order, idx = heap[0]
+            amounts[idx] += 1
+            heapq.heapreplace(heap, (simulated_total + 1, order, idx))
+    return amounts
+
+
 def split_cents_fair_remainder(
     total_cents: int,
     participants: Sequence[str],
@@ -82,31 +124,12 @@ def split_cents_fair_remainder(
       lowest running total at that moment.
     - Ties are resolved by participant list order via participant_order.
     """
-    alloc = split_cents_penny_perfect(total_cents, participants)
-    participant_ids = list(alloc.participants)
-    participant_idx = {pid: idx for idx, pid in enumerate(participant_ids)}
-    m = len(participant_ids)
-
-    base = total_cents // m
-    remainder = total_cents % m
-
-    amounts = [base for _ in participant_ids]
-    simulated_totals = {
-        pid: running_totals.get(pid, 0) + base
-        for pid in participant_ids
-    }
-
-    for _ in range(remainder):
-        selected_pid = min(
-            participant_ids,
-            key=lambda pid: (simulated_totals[pid], participant_order[pid]),
-        )
-        amounts[participant_idx[selected_pid]] += 1
-        simulated_totals[selected_pid] += 1
+    participant_ids = _validated_split_inputs(total_cents, participants)
+    amounts = fair_remainder_amounts(total_cents, participant_ids, running_totals, participant_order)
 
     return Allocation(
         total_cents=total_cents,
-        participants=tuple(participant_ids),
+        participants=participant_ids,
         amounts_cents=tuple(amounts),
     )
 
@@ -118,8 +141,9 @@ def add_allocation_to_totals(
     Add an Allocation into a running totals dict (cents).
     Mutates and also returns the dict for convenience.
     """
+    get = totals_by_participant.get
     for pid, cents in zip(allocation.participants, allocation.amounts_cents, strict=True):
-        totals_by_participant[pid] = totals_by_participant.get(pid, 0) + cents
+        totals_by_participant[pid] = get(pid, 0) + cents
     return totals_by_participant
 
 
@@ -139,12 +163,19 @@ def split_items_and_sum(
     """
     totals: Dict[str, int] = {}
     participant_order: Dict[str, int] = {}
+    get_total = totals.get
 
     for _item_id, cents, pids in items:
+        _validate_split_shape(cents, pids)
+        # Ids are checked once, when first seen; later items reuse the verdict.
         for pid in pids:
             if pid not in participant_order:
+                _validate_participant_id(pid)
                 participant_order[pid] = len(participant_order)
 
-        alloc = split_cents_fair_remainder(cents, pids, totals, participant_order)
-        add_allocation_to_totals(totals, alloc)
+        # Same math as split_cents_fair_remainder + add_allocation_to_totals,
+        # without building an Allocation per item.
+        amounts = fair_remainder_amounts(cents, pids, totals, participant_order)
+        for pid, amount in zip(pids, amounts):
+            totals[pid] = get_total(pid, 0) + amount
     return totals
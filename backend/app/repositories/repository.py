@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Iterable, Sequence
+from functools import partial
+from typing import Any, Callable, Iterable, Sequence
+
+import orjson
 
 try:
     import psycopg
+    from psycopg.rows import class_row
 except ImportError:  # pragma: no cover
     psycopg = None
+    class_row = None
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:  # pragma: no cover
+    ConnectionPool = None
 
 from app.services.receipt_parser import ParsedItem
 
@@ -20,14 +31,14 @@ class RepositoryConflictError(ValueError):
     """Raised when a write conflicts with existing data."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ReceiptItemRecord:
     id: str
     description: str
     price_cents: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BillPreviewRecord:
     receipt_image_id: str
     bill_description: str
@@ -35,20 +46,20 @@ class BillPreviewRecord:
     has_image: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ReceiptImageRecord:
     image_blob: bytes | None
     image_path: str | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BillSplitParticipantLine:
     receipt_item_id: str
     item_description: str
     amount_cents: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BillSplitParticipantRecord:
     participant_id: str
     participant_name: str
@@ -56,7 +67,7 @@ class BillSplitParticipantRecord:
     lines: list[BillSplitParticipantLine]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BillSplitDetailRecord:
     receipt_image_id: str
     bill_description: str
@@ -66,56 +77,23 @@ class BillSplitDetailRecord:
     participants: list[BillSplitParticipantRecord]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ParticipantRecord:
     id: str
     display_name: str
     running_total_cents: int
 
 
-@dataclass(frozen=True)
+# Built once per (item, participant) while splitting; not frozen so __init__ uses
+# plain slot stores instead of object.__setattr__.
+@dataclass(slots=True)
 class ItemAllocation:
     participant_id: str
     receipt_item_id: str
     amount_cents: int
 
 
-@dataclass(frozen=True)
-class ParticipantLedgerLine:
-    receipt_image_id: str
-    bill_description: str
-    receipt_item_id: str
-    item_description: str
-    amount_cents: int
-
-
-@dataclass(frozen=True)
-class RunningBalanceLine:
-    receipt_id: str
-    bill_description: str
-    receipt_item_id: str
-    item_name: str
-    contribution_cents: int
-
-
-@dataclass(frozen=True)
-class RunningBalanceTransactionEvent:
-    event_id: str
-    event_at: datetime
-    amount_cents: int
-    reference_details: str
-
-
-@dataclass(frozen=True)
-class RunningBalanceParticipant:
-    participant_id: str
-    participant_name: str
-    lines: list[RunningBalanceLine]
-    settlement_events: list[RunningBalanceTransactionEvent]
-    repayment_events: list[RunningBalanceTransactionEvent]
-
-
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FolioSummaryRecord:
     participant_id: str
     display_name: str
@@ -127,7 +105,7 @@ class FolioSummaryRecord:
     overpayment_cents: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FolioEventRecord:
     event_id: str
     event_at: datetime
@@ -140,7 +118,7 @@ class FolioEventRecord:
     receipt_item_id: str | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FolioDetailRecord:
     summary: FolioSummaryRecord
     charge_events: list[FolioEventRecord]
@@ -148,7 +126,7 @@ class FolioDetailRecord:
     repayment_events: list[FolioEventRecord]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SettlementCreateResult:
     settlement_id: str
     previous_net_balance_cents: int
@@ -159,7 +137,7 @@ class SettlementCreateResult:
     idempotency_replayed: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SettlementReverseResult:
     settlement_id: str
     previous_net_balance_cents: int
@@ -170,7 +148,7 @@ class SettlementReverseResult:
     reversal_applied: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RepaymentCreateResult:
     repayment_id: str
     previous_net_balance_cents: int
@@ -181,7 +159,7 @@ class RepaymentCreateResult:
     idempotency_replayed: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RepaymentReverseResult:
     repayment_id: str
     previous_net_balance_cents: int
@@ -192,7 +170,7 @@ class RepaymentReverseResult:
     reversal_applied: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RunningTotalMismatchRecord:
     participant_id: str
     display_name: str
@@ -219,26 +197,160 @@ def compute_folio_metrics(
     return net_balance_cents, folio_status_from_net_balance(net_balance_cents), overpayment_cents
 
 
+# Per-participant events since their balance last returned to zero (the "active cycle").
+# Windows run over the bare event rows; receipt/item descriptions are joined only onto
+# the active-cycle charges that are actually returned.
+_ACTIVE_EVENTS_CTE = """
+    WITH charge_events AS (
+        SELECT
+            pia.participant_id,
+            CONCAT('charge:', pia.id::text) AS event_id,
+            pia.created_at AS event_at,
+            1::int AS event_sort_order,
+            pia.amount_cents::int AS net_delta,
+            'charge'::text AS event_type,
+            pia.receipt_item_id,
+            pia.amount_cents::int AS amount_cents,
+            NULL::text AS reference_details
+        FROM participant_item_allocations pia
+    ),
+    settlement_events AS (
+        SELECT
+            ps.participant_id,
+            CONCAT('settlement:', ps.id::text) AS event_id,
+            COALESCE(ps.paid_at, ps.recorded_at) AS event_at,
+            2::int AS event_sort_order,
+            (-ps.amount_cents)::int AS net_delta,
+            'settlement'::text AS event_type,
+            NULL::uuid AS receipt_item_id,
+            ps.amount_cents::int AS amount_cents,
+            COALESCE(ps.note, 'Settlement') AS reference_details
+        FROM participant_settlements ps
+        WHERE ps.reversed_at IS NULL
+    ),
+    repayment_events AS (
+        SELECT
+            pr.participant_id,
+            CONCAT('repayment:', pr.id::text) AS event_id,
+            COALESCE(pr.paid_at, pr.recorded_at) AS event_at,
+            3::int AS event_sort_order,
+            pr.amount_cents::int AS net_delta,
+            'repayment'::text AS event_type,
+            NULL::uuid AS receipt_item_id,
+            pr.amount_cents::int AS amount_cents,
+            COALESCE(pr.note, 'Repayment') AS reference_details
+        FROM participant_repayments pr
+        WHERE pr.reversed_at IS NULL
+    ),
+    events AS (
+        SELECT * FROM charge_events
+        UNION ALL
+        SELECT * FROM settlement_events
+        UNION ALL
+        SELECT * FROM repayment_events
+    ),
+    ordered AS (
+        SELECT
+            e.participant_id,
+            e.event_id,
+            e.event_at,
+            e.event_sort_order,
+            e.event_type,
+            e.receipt_item_id,
+            e.amount_cents,
+            e.reference_details,
+            ROW_NUMBER() OVER (
+                PARTITION BY e.participant_id
+                ORDER BY e.event_at ASC, e.event_sort_order ASC, e.event_id ASC
+            ) AS event_rank,
+            SUM(e.net_delta) OVER (
+                PARTITION BY e.participant_id
+                ORDER BY e.event_at ASC, e.event_sort_order ASC, e.event_id ASC
+                ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+            )::int AS cumulative_net
+        FROM events e
+    ),
+    last_zero AS (
+        SELECT
+            participant_id,
+            MAX(event_rank) AS last_zero_rank
+        FROM ordered
+        WHERE cumulative_net = 0
+        GROUP BY participant_id
+    ),
+    active_events AS (
+        SELECT
+            o.participant_id,
+            o.event_id,
+            o.event_type,
+            o.receipt_item_id,
+            o.amount_cents,
+            o.reference_details,
+            o.event_at,
+            o.event_sort_order
+        FROM ordered o
+        LEFT JOIN last_zero lz ON lz.participant_id = o.participant_id
+        WHERE o.event_rank > COALESCE(lz.last_zero_rank, 0)
+    )
+"""
+
+
+def _raise_runtime_error(message: str) -> Any:
+    raise RuntimeError(message)
+
+
 class SplitItRepository:
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, *, pool_max_size: int = 10, prepare_threshold: int | None = 1):
         self.database_url = database_url.strip()
+        self.pool_max_size = pool_max_size
+        self.prepare_threshold = prepare_threshold
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Picked once so repository methods don't re-check configuration on every query.
+        self._connect = self._select_connect()
 
     @property
     def enabled(self) -> bool:
         return bool(self.database_url)
 
-    def _connect(self):
+    def _select_connect(self) -> Callable[[], Any]:
         if not self.enabled:
-            raise RuntimeError("DATABASE_URL not configured")
+            return partial(_raise_runtime_error, "DATABASE_URL not configured")
         if psycopg is None:
-            raise RuntimeError("psycopg is not installed")
-        return psycopg.connect(self.database_url)
+            return partial(_raise_runtime_error, "psycopg is not installed")
+        if ConnectionPool is None:
+            return partial(psycopg.connect, self.database_url, prepare_threshold=self.prepare_threshold)
+        return self._pooled_connection
+
+    def _pooled_connection(self):
+        # Pooled connections commit on clean exit and roll back on error, like psycopg.connect().
+        return self._get_pool().connection()
+
+    def _get_pool(self):
+        # Opened on first use so the app can start (and fork workers) before the DB is reachable.
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ConnectionPool(
+                        self.database_url,
+                        min_size=1,
+                        max_size=self.pool_max_size,
+                        kwargs={"prepare_threshold": self.prepare_threshold},
+                        open=True,
+                    )
+        return self._pool
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
 
     @staticmethod
     def _map_folio_summary_row(row: tuple[str, str, int, int, int]) -> FolioSummaryRecord:
-        total_charged_cents = int(row[2])
-        total_settled_cents = int(row[3])
-        total_repaid_cents = int(row[4])
+        total_charged_cents = row[2]
+        total_settled_cents = row[3]
+        total_repaid_cents = row[4]
         net_balance_cents, status, overpayment_cents = compute_folio_metrics(
             total_charged_cents,
             total_settled_cents,
@@ -303,17 +415,22 @@ class SplitItRepository:
             cur.execute(
                 """
                 INSERT INTO receipt_images (owner_id, description, image_blob, status, finalized_at)
-                VALUES (%s, %s, %s, 'draft', NULL)
-                RETURNING id
+                VALUES (%s, %s, %b, 'draft', NULL)
+                RETURNING id::text
                 """,
                 (owner_id, description, image_bytes),
             )
             receipt_id = cur.fetchone()[0]
             conn.commit()
-            return str(receipt_id)
+            return receipt_id
 
     def replace_receipt_items(self, *, receipt_image_id: str, items: Sequence[ParsedItem]) -> list[ReceiptItemRecord]:
-        with self._connect() as conn, conn.cursor() as cur:
+        # Pipelined: the statements go out together and only the RETURNING rows are waited on.
+        with (
+            self._connect() as conn,
+            conn.pipeline(),
+            conn.cursor(row_factory=class_row(ReceiptItemRecord)) as cur,
+        ):
             cur.execute(
                 """
                 DELETE FROM receipt_items
@@ -322,19 +439,6 @@ class SplitItRepository:
                 (receipt_image_id,),
             )
 
-            inserted: list[ReceiptItemRecord] = []
-            for item in items:
-                cur.execute(
-                    """
-                    INSERT INTO receipt_items (receipt_image_id, description, item_price_cents)
-                    VALUES (%s, %s, %s)
-                    RETURNING id, description, item_price_cents
-                    """,
-                    (receipt_image_id, item.description, item.price_cents),
-                )
-                row = cur.fetchone()
-                inserted.append(ReceiptItemRecord(id=str(row[0]), description=str(row[1]), price_cents=int(row[2])))
-
             # Editing items re-opens the bill as draft until splits are submitted again.
             cur.execute(
                 """
@@ -347,21 +451,51 @@ class SplitItRepository:
                 (receipt_image_id,),
             )
 
+            inserted: list[ReceiptItemRecord] = []
+            if items:
+                # One multi-row insert. RETURNING has no documented row order, so ids are
+                # generated alongside each row's position and the outer SELECT sorts by it.
+                cur.execute(
+                    """
+                    WITH new_items AS (
+                        SELECT gen_random_uuid() AS id, t.description, t.price_cents, t.position
+                        FROM unnest(%s::text[], %s::int[]) WITH ORDINALITY AS t(description, price_cents, position)
+                    ),
+                    inserted AS (
+                        INSERT INTO receipt_items (id, receipt_image_id, description, item_price_cents)
+                        SELECT id, %s, description, price_cents
+                        FROM new_items
+                        RETURNING id
+                    )
+                    SELECT new_items.id::text AS id, new_items.description, new_items.price_cents
+                    FROM new_items
+                    JOIN inserted ON inserted.id = new_items.id
+                    ORDER BY new_items.position
+                    """,
+                    (
+                        [item.description for item in items],
+                        [item.price_cents for item in items],
+                        receipt_image_id,
+                    ),
+                )
+                inserted = cur.fetchall()
+
             conn.commit()
             return inserted
 
     def get_receipt_items(self, *, receipt_image_id: str) -> list[ReceiptItemRecord]:
-        with self._connect() as conn, conn.cursor() as cur:
+        with self._connect() as conn, conn.cursor(row_factory=class_row(ReceiptItemRecord)) as cur:
             cur.execute(
                 """
-                SELECT id::text, description, item_price_cents
-                FROM receipt_items
-                WHERE receipt_image_id = %s
-                ORDER BY created_at ASC, id ASC
+                SELECT ritem.id::text AS id, ritem.description, ritem.item_price_cents AS price_cents
+                FROM receipt_items ritem
+                WHERE ritem.receipt_image_id = %s
+                -- Qualified so the sort uses the uuid column (index order), not the text alias.
+                ORDER BY ritem.created_at ASC, ritem.id ASC
                 """,
                 (receipt_image_id,),
             )
-            return [ReceiptItemRecord(id=row[0], description=row[1], price_cents=int(row[2])) for row in cur.fetchall()]
+            return cur.fetchall()
 
     def list_bill_previews(self) -> list[BillPreviewRecord]:
         with self._connect() as conn, conn.cursor() as cur:
@@ -382,7 +516,7 @@ class SplitItRepository:
                     receipt_image_id=row[0],
                     bill_description=row[1],
                     entered_at=row[2],
-                    has_image=bool(row[3]),
+                    has_image=row[3],
                 )
                 for row in cur.fetchall()
             ]
@@ -396,6 +530,8 @@ class SplitItRepository:
                 WHERE id = %s
                 """,
                 (receipt_image_id,),
+                # Binary results return bytea as raw bytes instead of hex-escaped text.
+                binary=True,
             )
             row = cur.fetchone()
             if row is None:
@@ -445,46 +581,59 @@ class SplitItRepository:
         receipt_id = rows[0][0]
         bill_description = rows[0][1]
         entered_at = rows[0][2]
-        has_image = bool(rows[0][3])
+        has_image = rows[0][3]
 
-        participants_map: dict[str, dict] = {}
+        # Rows are ordered by participant, so each participant's lines are contiguous.
+        participants: list[BillSplitParticipantRecord] = []
+        bill_total_cents = 0
+        current_participant_id: str | None = None
+        current_participant_name = ""
+        current_total_cents = 0
+        current_lines: list[BillSplitParticipantLine] = []
 
         for row in rows:
             participant_id = row[4]
             if participant_id is None:
                 continue
 
-            if participant_id not in participants_map:
-                participants_map[participant_id] = {
-                    "participant_name": row[5],
-                    "participant_total_cents": 0,
-                    "lines": [],
-                }
+            if participant_id != current_participant_id:
+                if current_participant_id is not None:
+                    participants.append(
+                        BillSplitParticipantRecord(
+                            participant_id=current_participant_id,
+                            participant_name=current_participant_name,
+                            participant_total_cents=current_total_cents,
+                            lines=current_lines,
+                        )
+                    )
+                current_participant_id = participant_id
+                current_participant_name = row[5]
+                current_total_cents = 0
+                current_lines = []
 
             if row[6] is None:
                 continue
 
-            amount_cents = int(row[8])
-            participants_map[participant_id]["lines"].append(
+            amount_cents = row[8]
+            current_lines.append(
                 BillSplitParticipantLine(
                     receipt_item_id=row[6],
                     item_description=row[7],
                     amount_cents=amount_cents,
                 )
             )
-            participants_map[participant_id]["participant_total_cents"] += amount_cents
-
-        participants = [
-            BillSplitParticipantRecord(
-                participant_id=participant_id,
-                participant_name=data["participant_name"],
-                participant_total_cents=data["participant_total_cents"],
-                lines=data["lines"],
-            )
-            for participant_id, data in participants_map.items()
-        ]
+            current_total_cents += amount_cents
+            bill_total_cents += amount_cents
 
-        bill_total_cents = sum(participant.participant_total_cents for participant in participants)
+        if current_participant_id is not None:
+            participants.append(
+                BillSplitParticipantRecord(
+                    participant_id=current_participant_id,
+                    participant_name=current_participant_name,
+                    participant_total_cents=current_total_cents,
+                    lines=current_lines,
+                )
+            )
 
         return BillSplitDetailRecord(
             receipt_image_id=receipt_id,
@@ -496,52 +645,46 @@ class SplitItRepository:
         )
 
     def list_participants(self) -> list[ParticipantRecord]:
-        with self._connect() as conn, conn.cursor() as cur:
+        with self._connect() as conn, conn.cursor(row_factory=class_row(ParticipantRecord)) as cur:
             cur.execute(
                 """
-                SELECT id::text, display_name, running_total_cents
+                SELECT id::text AS id, display_name, running_total_cents
                 FROM participants
                 ORDER BY created_at ASC, display_name ASC
                 """
             )
-            return [
-                ParticipantRecord(id=row[0], display_name=row[1], running_total_cents=int(row[2]))
-                for row in cur.fetchall()
-            ]
+            return cur.fetchall()
 
     def get_participants_by_ids(self, *, participant_ids: Sequence[str]) -> list[ParticipantRecord]:
         if not participant_ids:
             return []
 
-        with self._connect() as conn, conn.cursor() as cur:
+        with self._connect() as conn, conn.cursor(row_factory=class_row(ParticipantRecord)) as cur:
             cur.execute(
                 """
-                SELECT id::text, display_name, running_total_cents
+                SELECT id::text AS id, display_name, running_total_cents
                 FROM participants
                 WHERE id = ANY(%s::uuid[])
                 """,
                 (list(participant_ids),),
             )
-            return [
-                ParticipantRecord(id=row[0], display_name=row[1], running_total_cents=int(row[2]))
-                for row in cur.fetchall()
-            ]
+            return cur.fetchall()
 
     def create_or_get_participant(self, *, display_name: str) -> ParticipantRecord:
-        with self._connect() as conn, conn.cursor() as cur:
+        with self._connect() as conn, conn.cursor(row_factory=class_row(ParticipantRecord)) as cur:
             cur.execute(
                 """
                 INSERT INTO participants (display_name, running_total_cents)
                 VALUES (%s, 0)
                 ON CONFLICT (display_name)
                 DO UPDATE SET display_name = EXCLUDED.display_name
-                RETURNING id::text, display_name, running_total_cents
+                RETURNING id::text AS id, display_name, running_total_cents
                 """,
                 (display_name,),
             )
-            row = cur.fetchone()
+            participant = cur.fetchone()
             conn.commit()
-            return ParticipantRecord(id=row[0], display_name=row[1], running_total_cents=int(row[2]))
+            return participant
 
     def participant_has_allocations(self, *, participant_id: str) -> bool:
         with self._connect() as conn, conn.cursor() as cur:
@@ -571,34 +714,35 @@ class SplitItRepository:
             return deleted
 
     def replace_allocations_for_receipt(self, *, receipt_image_id: str, allocations: Iterable[ItemAllocation]) -> None:
-        with self._connect() as conn, conn.cursor() as cur:
+        participant_ids: list[str] = []
+        receipt_item_ids: list[str] = []
+        amounts_cents: list[int] = []
+        for alloc in allocations:
+            participant_ids.append(alloc.participant_id)
+            receipt_item_ids.append(alloc.receipt_item_id)
+            amounts_cents.append(alloc.amount_cents)
+
+        # The DELETE stays a separate statement: a data-modifying CTE shares one snapshot
+        # with the INSERT, which would still see the old (participant, item) unique keys.
+        # The pipeline sends all three statements in a single round-trip.
+        with self._connect() as conn, conn.pipeline(), conn.cursor() as cur:
             cur.execute(
                 """
-                SELECT id::text
-                FROM receipt_items
-                WHERE receipt_image_id = %s
+                DELETE FROM participant_item_allocations pia
+                USING receipt_items ritem
+                WHERE ritem.id = pia.receipt_item_id
+                  AND ritem.receipt_image_id = %s
                 """,
                 (receipt_image_id,),
             )
-            item_ids = [row[0] for row in cur.fetchall()]
 
-            if item_ids:
-                cur.execute(
-                    """
-                    DELETE FROM participant_item_allocations
-                    WHERE receipt_item_id = ANY(%s::uuid[])
-                    """,
-                    (item_ids,),
-                )
-
-            for alloc in allocations:
-                cur.execute(
-                    """
-                    INSERT INTO participant_item_allocations (participant_id, receipt_item_id, amount_cents)
-                    VALUES (%s, %s, %s)
-                    """,
-                    (alloc.participant_id, alloc.receipt_item_id, alloc.amount_cents),
-                )
+            cur.execute(
+                """
+                INSERT INTO participant_item_allocations (participant_id, receipt_item_id, amount_cents)
+                SELECT * FROM unnest(%s::uuid[], %s::uuid[], %s::int[])
+                """,
+                (participant_ids, receipt_item_ids, amounts_cents),
+            )
 
             cur.execute(
                 """
@@ -613,34 +757,48 @@ class SplitItRepository:
 
             conn.commit()
 
-    def get_participant_ledger_lines(self, *, participant_id: str) -> list[ParticipantLedgerLine]:
+    def get_participant_ledger_bills_raw(self, *, participant_id: str) -> tuple[int, list[dict[str, Any]]]:
+        """Total and bills shaped like the ledger payload, grouped and ordered in SQL."""
         with self._connect() as conn, conn.cursor() as cur:
             cur.execute(
                 """
+                WITH bills AS (
+                    SELECT
+                        ri.id AS receipt_image_id,
+                        ri.created_at,
+                        SUM(pia.amount_cents)::bigint AS bill_total_cents,
+                        json_build_object(
+                            'receipt_image_id', ri.id::text,
+                            'bill_description', ri.description,
+                            'lines', json_agg(
+                                json_build_object(
+                                    'receipt_item_id', ritem.id::text,
+                                    'item_description', ritem.description,
+                                    'amount_cents', pia.amount_cents
+                                )
+                                ORDER BY ritem.id ASC
+                            )
+                        ) AS bill
+                    FROM participant_item_allocations pia
+                    JOIN receipt_items ritem ON ritem.id = pia.receipt_item_id
+                    JOIN receipt_images ri ON ri.id = ritem.receipt_image_id
+                    WHERE pia.participant_id = %s
+                    GROUP BY ri.id
+                )
                 SELECT
-                    ri.id::text AS receipt_image_id,
-                    ri.description AS bill_description,
-                    ritem.id::text AS receipt_item_id,
-                    ritem.description AS item_description,
-                    pia.amount_cents
-                FROM participant_item_allocations pia
-                JOIN receipt_items ritem ON ritem.id = pia.receipt_item_id
-                JOIN receipt_images ri ON ri.id = ritem.receipt_image_id
-                WHERE pia.participant_id = %s
-                ORDER BY ri.created_at DESC, ri.id DESC, ritem.id ASC
+                    COALESCE(SUM(bill_total_cents), 0)::bigint AS computed_total_cents,
+                    COALESCE(json_agg(bill ORDER BY created_at DESC, receipt_image_id DESC), '[]'::json)::text AS bills
+                FROM bills
                 """,
                 (participant_id,),
             )
-            return [
-                ParticipantLedgerLine(
-                    receipt_image_id=row[0],
-                    bill_description=row[1],
-                    receipt_item_id=row[2],
-                    item_description=row[3],
-                    amount_cents=int(row[4]),
-                )
-                for row in cur.fetchall()
-            ]
+            row = cur.fetchone()
+
+        return self._map_ledger_bills_row(row)
+
+    @staticmethod
+    def _map_ledger_bills_row(row: tuple[int, str]) -> tuple[int, list[dict[str, Any]]]:
+        return row[0], orjson.loads(row[1])
 
     def list_participant_folios(self) -> list[FolioSummaryRecord]:
         with self._connect() as conn, conn.cursor() as cur:
@@ -747,9 +905,9 @@ class SplitItRepository:
                 event_id=row[0],
                 event_at=row[1],
                 event_type=row[2],
-                amount_cents=int(row[3]),
-                previous_net_balance_cents=int(row[4]),
-                new_net_balance_cents=int(row[5]),
+                amount_cents=row[3],
+                previous_net_balance_cents=row[4],
+                new_net_balance_cents=row[5],
                 reference_details=row[6] or "",
                 receipt_image_id=row[7],
                 receipt_item_id=row[8],
@@ -861,7 +1019,7 @@ class SplitItRepository:
                     expected_new_net_balance_cents,
                 ),
             )
-            settlement_id = str(cur.fetchone()[0])
+            settlement_id = cur.fetchone()[0]
 
             cur.execute(
                 """
@@ -1065,7 +1223,7 @@ class SplitItRepository:
                     expected_new_net_balance_cents,
                 ),
             )
-            repayment_id = str(cur.fetchone()[0])
+            repayment_id = cur.fetchone()[0]
 
             cur.execute(
                 """
@@ -1172,212 +1330,119 @@ class SplitItRepository:
                 reversal_applied=not already_reversed,
             )
 
-    def list_running_balance_participants(self) -> list[RunningBalanceParticipant]:
+    def list_running_balance_participants_raw(self) -> list[dict[str, Any]]:
+        """Running-balance activity shaped like the API payload, bills grouped in SQL."""
         with self._connect() as conn, conn.cursor() as cur:
             cur.execute(
-                """
-                WITH charge_events AS (
+                _ACTIVE_EVENTS_CTE
+                + """
+                ,
+                charge_lines AS (
                     SELECT
-                        pia.participant_id,
-                        CONCAT('charge:', pia.id::text) AS event_id,
-                        pia.created_at AS event_at,
-                        1::int AS event_sort_order,
-                        pia.amount_cents::int AS net_delta,
-                        'charge'::text AS event_type,
-                        ri.id::text AS receipt_id,
+                        ae.participant_id,
+                        ri.id AS receipt_id,
                         ri.description AS bill_description,
-                        ritem.id::text AS receipt_item_id,
+                        ritem.id AS receipt_item_id,
                         ritem.description AS item_name,
-                        pia.amount_cents::int AS amount_cents,
-                        CONCAT_WS(' | ', ri.description, ritem.description) AS reference_details
-                    FROM participant_item_allocations pia
-                    JOIN receipt_items ritem ON ritem.id = pia.receipt_item_id
+                        ae.amount_cents,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY ae.participant_id
+                            ORDER BY ae.event_at DESC, ae.event_sort_order DESC, ae.event_id DESC
+                        ) AS line_position
+                    FROM active_events ae
+                    JOIN receipt_items ritem ON ritem.id = ae.receipt_item_id
                     JOIN receipt_images ri ON ri.id = ritem.receipt_image_id
+                    WHERE ae.event_type = 'charge'
                 ),
-                settlement_events AS (
-                    SELECT
-                        ps.participant_id,
-                        CONCAT('settlement:', ps.id::text) AS event_id,
-                        COALESCE(ps.paid_at, ps.recorded_at) AS event_at,
-                        2::int AS event_sort_order,
-                        (-ps.amount_cents)::int AS net_delta,
-                        'settlement'::text AS event_type,
-                        NULL::text AS receipt_id,
-                        NULL::text AS bill_description,
-                        NULL::text AS receipt_item_id,
-                        NULL::text AS item_name,
-                        ps.amount_cents::int AS amount_cents,
-                        COALESCE(ps.note, 'Settlement') AS reference_details
-                    FROM participant_settlements ps
-                    WHERE ps.reversed_at IS NULL
-                ),
-                repayment_events AS (
+                bills AS (
                     SELECT
-                        pr.participant_id,
-                        CONCAT('repayment:', pr.id::text) AS event_id,
-                        COALESCE(pr.paid_at, pr.recorded_at) AS event_at,
-                        3::int AS event_sort_order,
-                        pr.amount_cents::int AS net_delta,
-                        'repayment'::text AS event_type,
-                        NULL::text AS receipt_id,
-                        NULL::text AS bill_description,
-                        NULL::text AS receipt_item_id,
-                        NULL::text AS item_name,
-                        pr.amount_cents::int AS amount_cents,
-                        COALESCE(pr.note, 'Repayment') AS reference_details
-                    FROM participant_repayments pr
-                    WHERE pr.reversed_at IS NULL
-                ),
-                events AS (
-                    SELECT * FROM charge_events
-                    UNION ALL
-                    SELECT * FROM settlement_events
-                    UNION ALL
-                    SELECT * FROM repayment_events
-                ),
-                ordered AS (
-                    SELECT
-                        e.participant_id,
-                        e.event_id,
-                        e.event_at,
-                        e.event_sort_order,
-                        e.event_type,
-                        e.receipt_id,
-                        e.bill_description,
-                        e.receipt_item_id,
-                        e.item_name,
-                        e.amount_cents,
-                        e.reference_details,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY e.participant_id
-                            ORDER BY e.event_at ASC, e.event_sort_order ASC, e.event_id ASC
-                        ) AS event_rank,
-                        SUM(e.net_delta) OVER (
-                            PARTITION BY e.participant_id
-                            ORDER BY e.event_at ASC, e.event_sort_order ASC, e.event_id ASC
-                            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
-                        )::int AS cumulative_net
-                    FROM events e
+                        participant_id,
+                        MIN(line_position) AS bill_position,
+                        SUM(amount_cents)::int AS bill_total_cents,
+                        json_build_object(
+                            'receipt_id', receipt_id::text,
+                            'bill_description', bill_description,
+                            'bill_total_cents', SUM(amount_cents)::int,
+                            'lines', json_agg(
+                                json_build_object(
+                                    'receipt_item_id', receipt_item_id::text,
+                                    'item_name', item_name,
+                                    'contribution_cents', amount_cents
+                                )
+                                ORDER BY line_position
+                            )
+                        ) AS bill
+                    FROM charge_lines
+                    GROUP BY participant_id, receipt_id, bill_description
                 ),
-                last_zero AS (
+                participant_bills AS (
                     SELECT
                         participant_id,
-                        MAX(event_rank) AS last_zero_rank
-                    FROM ordered
-                    WHERE cumulative_net = 0
+                        json_agg(bill ORDER BY bill_position) AS bills,
+                        SUM(bill_total_cents)::int AS charged_cents
+                    FROM bills
                     GROUP BY participant_id
                 ),
-                active_charge_events AS (
+                participant_transactions AS (
                     SELECT
-                        o.participant_id,
-                        o.event_id,
-                        o.event_type,
-                        o.receipt_id,
-                        o.bill_description,
-                        o.receipt_item_id,
-                        o.item_name,
-                        o.amount_cents,
-                        o.reference_details,
-                        o.event_at,
-                        o.event_sort_order
-                    FROM ordered o
-                    LEFT JOIN last_zero lz ON lz.participant_id = o.participant_id
-                    WHERE o.event_rank > COALESCE(lz.last_zero_rank, 0)
+                        participant_id,
+                        json_agg(
+                            json_build_object(
+                                'event_id', event_id,
+                                'event_at', event_at,
+                                'amount_cents', amount_cents,
+                                'reference_details', COALESCE(reference_details, '')
+                            )
+                            ORDER BY event_at DESC, event_sort_order DESC, event_id DESC
+                        ) FILTER (WHERE event_type = 'settlement') AS settlement_events,
+                        json_agg(
+                            json_build_object(
+                                'event_id', event_id,
+                                'event_at', event_at,
+                                'amount_cents', amount_cents,
+                                'reference_details', COALESCE(reference_details, '')
+                            )
+                            ORDER BY event_at DESC, event_sort_order DESC, event_id DESC
+                        ) FILTER (WHERE event_type = 'repayment') AS repayment_events
+                    FROM active_events
+                    WHERE event_type <> 'charge'
+                    GROUP BY participant_id
                 )
                 SELECT
                     p.id::text AS participant_id,
                     p.display_name AS participant_name,
-                    ae.event_id,
-                    ae.event_at,
-                    ae.event_type,
-                    ae.receipt_id,
-                    ae.bill_description,
-                    ae.receipt_item_id,
-                    ae.item_name,
-                    ae.amount_cents,
-                    ae.reference_details
+                    COALESCE(pb.bills, '[]'::json)::text AS bills,
+                    COALESCE(pb.charged_cents, 0) AS active_cycle_charged_cents,
+                    COALESCE(pt.settlement_events, '[]'::json)::text AS settlement_events,
+                    COALESCE(pt.repayment_events, '[]'::json)::text AS repayment_events
                 FROM participants p
-                LEFT JOIN active_charge_events ae ON ae.participant_id = p.id
-                ORDER BY
-                    p.display_name ASC,
-                    ae.event_at DESC NULLS LAST,
-                    ae.event_sort_order DESC NULLS LAST,
-                    ae.event_id DESC NULLS LAST
+                LEFT JOIN participant_bills pb ON pb.participant_id = p.id
+                LEFT JOIN participant_transactions pt ON pt.participant_id = p.id
+                ORDER BY p.display_name ASC
                 """
             )
             rows = cur.fetchall()
 
-        participants: list[RunningBalanceParticipant] = []
-        current_participant_id: str | None = None
-        current_lines: list[RunningBalanceLine] = []
-        current_settlement_events: list[RunningBalanceTransactionEvent] = []
-        current_repayment_events: list[RunningBalanceTransactionEvent] = []
-        current_participant_name = ""
-
-        for row in rows:
-            participant_id = row[0]
-            participant_name = row[1]
-            event_id = row[2]
-
-            if participant_id != current_participant_id:
-                if current_participant_id is not None:
-                    participants.append(
-                        RunningBalanceParticipant(
-                            participant_id=current_participant_id,
-                            participant_name=current_participant_name,
-                            lines=current_lines,
-                            settlement_events=current_settlement_events,
-                            repayment_events=current_repayment_events,
-                        )
-                    )
-                current_participant_id = participant_id
-                current_participant_name = participant_name
-                current_lines = []
-                current_settlement_events = []
-                current_repayment_events = []
-
-            if event_id is None:
-                continue
-
-            event_at = row[3]
-            event_type = row[4]
-            if event_type == "charge":
-                if row[5] is None:
-                    continue
-                current_lines.append(
-                    RunningBalanceLine(
-                        receipt_id=row[5],
-                        bill_description=row[6],
-                        receipt_item_id=row[7],
-                        item_name=row[8],
-                        contribution_cents=int(row[9]),
-                    )
-                )
-                continue
-
-            transaction_event = RunningBalanceTransactionEvent(
-                event_id=event_id,
-                event_at=event_at,
-                amount_cents=int(row[9]),
-                reference_details=row[10] or "",
-            )
-            if event_type == "settlement":
-                current_settlement_events.append(transaction_event)
-            elif event_type == "repayment":
-                current_repayment_events.append(transaction_event)
-
-        if current_participant_id is not None:
-            participants.append(
-                RunningBalanceParticipant(
-                    participant_id=current_participant_id,
-                    participant_name=current_participant_name,
-                    lines=current_lines,
-                    settlement_events=current_settlement_events,
-                    repayment_events=current_repayment_events,
-                )
-            )
+        return [
+            {
+                "participant_id": row[0],
+                "participant_name": row[1],
+                "bills": orjson.loads(row[2]),
+                "active_cycle_charged_cents": row[3],
+                "settlement_events": self._parse_running_balance_event_dicts(row[4]),
+                "repayment_events": self._parse_running_balance_event_dicts(row[5]),
+            }
+            for row in rows
+        ]
 
-        return participants
+    @staticmethod
+    def _parse_running_balance_event_dicts(events_json: str) -> list[dict[str, Any]]:
+        # Postgres trims trailing zeros from JSON timestamps; re-emit the same
+        # ISO form the other endpoints use.
+        events = orjson.loads(events_json)
+        for event in events:
+            event["event_at"] = datetime.fromisoformat(event["event_at"]).isoformat()
+        return events
 
     def list_running_total_mismatches(self) -> list[RunningTotalMismatchRecord]:
         with self._connect() as conn, conn.cursor() as cur:
@@ -1430,9 +1495,9 @@ class SplitItRepository:
             RunningTotalMismatchRecord(
                 participant_id=row[0],
                 display_name=row[1],
-                cached_net_balance_cents=int(row[2]),
-                computed_net_balance_cents=int(row[3]),
-                delta_cents=int(row[2]) - int(row[3]),
+                cached_net_balance_cents=row[2],
+                computed_net_balance_cents=row[3],
+                delta_cents=row[2] - row[3],
             )
             for row in rows
         ]
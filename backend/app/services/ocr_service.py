@@ -1,28 +1,46 @@
 from __future__ import annotations
 
 import io
+import threading
 from dataclasses import dataclass
+from itertools import islice
+from operator import itemgetter
 from typing import List, Tuple
 
 import easyocr
 import numpy as np
 from PIL import Image, ImageOps
 
+from app.config import Config
+
 
 class OcrError(RuntimeError):
     pass
 
 
 _READER: easyocr.Reader | None = None
+_READER_LOCK = threading.Lock()
 
 
 def _get_reader() -> easyocr.Reader:
     global _READER
     if _READER is None:
-        _READER = easyocr.Reader(["en"], gpu=False)
+        with _READER_LOCK:
+            if _READER is None:
+                _READER = easyocr.Reader(["en"], gpu=Config.OCR_GPU)
     return _READER
 
 
+def warm_up() -> None:
+    """Load the model and run one tiny inference so the first receipt doesn't pay for it."""
+    try:
+        _get_reader().readtext(np.zeros((32, 32), dtype=np.uint8), detail=0)
+    except Exception:
+        # Used as the OCR pool initializer, where raising would break the whole
+        # pool; run_ocr retries the load and reports the error per request.
+        pass
+
+
 @dataclass(frozen=True)
 class _Box:
     x1: float
@@ -66,38 +84,41 @@ def _group_into_lines(boxes: List[_Box]) -> List[str]:
     if not boxes:
         return []
 
-    # Filter very low confidence noise
-    boxes = [b for b in boxes if b.conf >= 0.2]
+    # Filter very low confidence noise, reading each box's geometry once.
+    rows = [(b.cy, b.x1, b.h, b.text) for b in boxes if b.conf >= 0.2]
+    if not rows:
+        return []
 
     # Sort top-to-bottom
-    boxes.sort(key=lambda b: (b.cy, b.x1))
+    rows.sort(key=itemgetter(0, 1))
 
-    lines: List[List[_Box]] = []
-    current: List[_Box] = [boxes[0]]
-    current_y = boxes[0].cy
-    current_h = boxes[0].h
+    lines: List[List[Tuple[float, str]]] = []
+    first_y, first_x, current_h, first_text = rows[0]
+    current: List[Tuple[float, str]] = [(first_x, first_text)]
+    current_y = current_sum_y = first_y
 
-    for b in boxes[1:]:
+    for cy, x1, h, text in islice(rows, 1, None):
         # Dynamic threshold based on typical text height
-        thresh = max(10.0, 0.6 * max(current_h, b.h))
-        if abs(b.cy - current_y) <= thresh:
-            current.append(b)
-            # Update running line center/height
-            current_y = sum(x.cy for x in current) / len(current)
-            current_h = max(current_h, b.h)
+        thresh = max(10.0, 0.6 * max(current_h, h))
+        if abs(cy - current_y) <= thresh:
+            current.append((x1, text))
+            # Update running line center/height (running sum, not a re-sum per box)
+            current_sum_y += cy
+            current_y = current_sum_y / len(current)
+            current_h = max(current_h, h)
         else:
             lines.append(current)
-            current = [b]
-            current_y = b.cy
-            current_h = b.h
+            current = [(x1, text)]
+            current_y = current_sum_y = cy
+            current_h = h
 
     lines.append(current)
 
     # Within each line, sort left-to-right then join with spaces
     out: List[str] = []
     for line_boxes in lines:
-        line_boxes.sort(key=lambda b: b.x1)
-        text = " ".join(b.text for b in line_boxes)
+        line_boxes.sort(key=itemgetter(0))
+        text = " ".join(t for _, t in line_boxes)
         text = " ".join(text.split())
         if text:
             out.append(text)
@@ -109,16 +130,22 @@ def run_ocr(image_bytes: bytes) -> str:
     if not isinstance(image_bytes, (bytes, bytearray)) or len(image_bytes) == 0:
         raise OcrError("image_bytes must be non-empty bytes")
 
+    # Phone photos are often 4000px+; shrinking (never enlarging) cuts decode-to-
+    # inference work, including the recognizer's per-box crops.
+    max_side = Config.OCR_MAX_IMAGE_SIDE
     try:
         img = Image.open(io.BytesIO(image_bytes))
+        # JPEG only: decode straight to luma (and at a reduced DCT scale when large).
+        img.draft("L", (max_side, max_side))
         img = ImageOps.exif_transpose(img)
-        img = img.convert("RGB")
+        # Convert to grayscale (helps receipts) directly from the source mode
+        gray = img.convert("L")
     except Exception as e:
         raise OcrError("Could not decode image bytes") from e
 
-    # Convert to grayscale (helps receipts)
-    gray = ImageOps.grayscale(img)
-    np_img = np.array(gray)
+    gray.thumbnail((max_side, max_side))
+    # asarray shares Pillow's buffer where it can; EasyOCR only reads the array.
+    np_img = np.asarray(gray)
 
     reader = _get_reader()
 
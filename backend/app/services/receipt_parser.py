@@ -12,7 +12,7 @@ class ReceiptParseError(ValueError):
     """Raised when parsing fails or inputs are invalid."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ParsedItem:
     description: str
     price_cents: int
@@ -28,18 +28,11 @@ class ParsedItem:
 #   $12.34-
 #   12,34
 #   $12
-_PRICE_AT_END_RE = re.compile(
-    r"""
-    (?P<token>
-      \$?\s*                 # optional $
-      \d{1,7}                # digits
-      (?:[.,]\d{1,2})      # optional decimals
-      \s*-?                  # optional trailing dash
-    )
-    \s*$                     # end of line
-    """,
-    re.VERBOSE,
-)
+#
+# Matched with fullmatch(): group 1 is the description, group 2 the token
+# (optional $, 1-7 digits, decimals, optional trailing dash). The lazy
+# description makes the token start at the same place search() would find.
+_PRICE_AT_END_RE = re.compile(r"(.*?)\s*(\$?\s*\d{1,7}(?:[.,]\d{1,2})\s*-?)\s*", re.DOTALL)
 
 # Common receipt summary lines we skip by default (conservative).
 _EXCLUDE_KEYWORDS = (
@@ -77,12 +70,19 @@ _EXCLUDE_KEYWORDS = (
 
 _HAS_LETTER = re.compile(r"[A-Za-z]")
 _TIME_LIKE = re.compile(r"\b\d{1,2}:\d{2}(:\d{2})?\b")  # 21:41 or 21:41:06
-_DIGIT = re.compile(r"\d")
+# OCR often splits the decimal point off a trailing price ("3 . 50", "3 ,50").
+_SPLIT_DECIMAL_AT_END = re.compile(r"(\d)\s*[.,]\s*(\d{2})\s*$")
+
+
+# One alternation scans each line once instead of one substring pass per keyword.
+# Spaces inside keywords match any whitespace run, so lines needn't be re-joined.
+_EXCLUDE_KEYWORDS_RE = re.compile(
+    "|".join(re.escape(k).replace(r"\ ", r"\s+") for k in _EXCLUDE_KEYWORDS)
+)
 
 
 def _looks_like_summary_line(text: str) -> bool:
-    t = " ".join(text.lower().split())
-    return any(k in t for k in _EXCLUDE_KEYWORDS)
+    return _EXCLUDE_KEYWORDS_RE.search(text.lower()) is not None
 
 
 def extract_items_from_lines(
@@ -112,16 +112,26 @@ def extract_items_from_lines(
         if not line:
             continue
 
-        line = re.sub(r"(\d)\s*[.,]\s*(\d{2})\s*$", r"\1.\2", line)
+        # Every accepted line ends with its price token: a digit, or the
+        # trailing "-" of a negative amount. O(1) reject before any regex.
+        last = line[-1]
+        if not (last.isdecimal() or last == "-"):
+            continue
+
+        # search() + slicing skips sub()'s template expansion on every line;
+        # the pattern is anchored at $, so there is at most one match.
+        fix = _SPLIT_DECIMAL_AT_END.search(line)
+        if fix:
+            line = f"{line[:fix.start()]}{fix[1]}.{fix[2]}"
 
         if exclude_summary_lines and _looks_like_summary_line(line):
             continue
 
-        m = _PRICE_AT_END_RE.search(line)
+        m = _PRICE_AT_END_RE.fullmatch(line)
         if not m:
             continue
 
-        token = m.group("token").strip()
+        desc, token = m.groups()
         try:
             price_cents = parse_usd_to_cents(token, allow_negative=True)
         except MoneyError:
@@ -130,7 +140,7 @@ def extract_items_from_lines(
         if abs(price_cents) < min_price_cents:
             continue
 
-        desc = line[: m.start("token")].strip()
+        desc = desc.strip()
         if not desc:
             continue
 
@@ -146,8 +156,9 @@ def extract_items_from_lines(
             continue
 
         # Filter: if description is mostly digits/spaces/punct, skip
-        digits = len(_DIGIT.findall(desc))
-        non_space = len([c for c in desc if not c.isspace()])
+        # (str.isdecimal is exactly re's \d; map/sum keep both counts in C).
+        digits = sum(map(str.isdecimal, desc))
+        non_space = len(desc) - sum(map(str.isspace, desc))
         if non_space > 0 and digits / non_space > 0.60:
             continue
 
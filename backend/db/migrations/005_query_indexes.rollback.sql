@@ -0,0 +1,4 @@
+DROP INDEX CONCURRENTLY IF EXISTS idx_participant_repayments_active;
+DROP INDEX CONCURRENTLY IF EXISTS idx_participant_settlements_active;
+DROP INDEX CONCURRENTLY IF EXISTS idx_allocations_receipt_item;
+DROP INDEX CONCURRENTLY IF EXISTS idx_receipt_items_receipt_image_created_at;
@@ -0,0 +1,19 @@
+-- CONCURRENTLY cannot run inside a transaction block, so apply with plain `psql -f` (no -1).
+
+-- Receipt item reads, DELETE ... USING receipt_items and the receipt_images FK cascade.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_receipt_items_receipt_image_created_at
+ON receipt_items (receipt_image_id, created_at, id);
+
+-- Bill split detail joins and the receipt_items FK cascade. The
+-- (participant_id, receipt_item_id) unique index already covers participant lookups.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_allocations_receipt_item
+ON participant_item_allocations (receipt_item_id);
+
+-- Folio and running-balance queries only read non-reversed transactions per participant.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_participant_settlements_active
+ON participant_settlements (participant_id)
+WHERE reversed_at IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_participant_repayments_active
+ON participant_repayments (participant_id)
+WHERE reversed_at IS NULL;
@@ -71,6 +71,20 @@ CREATE TABLE IF NOT EXISTS participant_repayments (
     new_net_balance_cents INTEGER NOT NULL
 );
 
+CREATE INDEX IF NOT EXISTS idx_receipt_items_receipt_image_created_at
+ON receipt_items (receipt_image_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_allocations_receipt_item
+ON participant_item_allocations (receipt_item_id);
+
+CREATE INDEX IF NOT EXISTS idx_participant_settlements_active
+ON participant_settlements (participant_id)
+WHERE reversed_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_participant_repayments_active
+ON participant_repayments (participant_id)
+WHERE reversed_at IS NULL;
+
 CREATE OR REPLACE FUNCTION validate_allocation_amount()
 RETURNS TRIGGER AS $$
 DECLARE
@@ -1,13 +1,39 @@
 import io
+import json
+import os
 from datetime import datetime, timezone
 
 import pytest
 from flask import Flask
 
+from app.api import routes
 from app.api.routes import api_bp
-
-
-@pytest.fixture()
+from app.repositories.repository import (
+    BillPreviewRecord,
+    BillSplitDetailRecord,
+    BillSplitParticipantLine,
+    BillSplitParticipantRecord,
+    FolioDetailRecord,
+    FolioEventRecord,
+    FolioSummaryRecord,
+    ItemAllocation,
+    ParticipantRecord,
+    ReceiptImageRecord,
+    ReceiptItemRecord,
+    RepaymentCreateResult,
+    RepaymentReverseResult,
+    SettlementCreateResult,
+    SettlementReverseResult,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_ocr_cache():
+    routes._OCR_CACHE.clear()
+
+
+# One app per module: tests only patch it through monkeypatch, which reverts.
+@pytest.fixture(scope="module")
 def app():
     app = Flask(__name__)
     app.register_blueprint(api_bp)
@@ -15,17 +41,58 @@ def app():
     return app
 
 
-@pytest.fixture()
+@pytest.fixture(scope="module")
 def client(app):
     return app.test_client()
 
 
+@pytest.fixture()
+def patch_repo(monkeypatch):
+    def _apply(repo):
+        monkeypatch.setattr(routes, "_repo", lambda: repo)
+
+    return _apply
+
+
 def test_health(client):
     r = client.get("/api/health")
     assert r.status_code == 200
     assert r.get_json() == {"status": "ok"}
 
 
+def test_app_factory_creates_ocr_pool_lazily():
+    from app import create_app
+
+    app = create_app()
+
+    assert "ocr_pool" not in app.extensions
+
+
+def test_app_factory_preloads_ocr_pool_when_configured(monkeypatch):
+    from app import create_app
+    from app.config import Config
+
+    submitted = []
+
+    class FakePool:
+        def __init__(self, *, max_workers, mp_context, initializer):
+            pass
+
+        def submit(self, fn, *args):
+            submitted.append(fn)
+
+    monkeypatch.setattr(Config, "OCR_PRELOAD", True)
+    monkeypatch.setattr(Config, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setattr(routes, "ProcessPoolExecutor", FakePool)
+
+    app = create_app()
+
+    pid, pool = app.extensions["ocr_pool"]
+    assert pid == os.getpid()
+    assert isinstance(pool, FakePool)
+    assert submitted == [int]
+
+
 def test_create_receipt_requires_db(client, monkeypatch):
     monkeypatch.setattr("app.services.ocr_service.run_ocr", lambda b: "Coffee 3.50")
     data = {"description": "Lunch", "image": (io.BytesIO(b"img"), "receipt.png")}
@@ -36,7 +103,17 @@ def test_create_receipt_requires_db(client, monkeypatch):
     assert r.get_json()["error"]["code"] == "db_unavailable"
 
 
-def test_create_receipt_returns_preview_items_and_persisted_image_id(client, monkeypatch):
+def test_create_receipt_rejects_oversized_upload(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "MAX_CONTENT_LENGTH", 64)
+    data = {"description": "Lunch", "image": (io.BytesIO(b"x" * 1024), "receipt.png")}
+
+    r = client.post("/api/receipts", data=data, content_type="multipart/form-data")
+
+    assert r.status_code == 413
+    assert r.get_json()["error"]["code"] == "payload_too_large"
+
+
+def test_create_receipt_returns_preview_items_and_persisted_image_id(client, patch_repo, monkeypatch):
     class FakeRepo:
         enabled = True
 
@@ -46,7 +123,7 @@ def test_create_receipt_returns_preview_items_and_persisted_image_id(client, mon
             assert image_bytes == b"fake-image"
             return "11111111-1111-1111-1111-111111111111"
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
     monkeypatch.setattr("app.services.ocr_service.run_ocr", lambda b: "Coffee 3.50\nBurger 8.25")
 
     r = client.post(
@@ -66,28 +143,173 @@ def test_create_receipt_returns_preview_items_and_persisted_image_id(client, mon
     }
 
 
+def test_create_receipt_runs_ocr_on_registered_pool(app, client, patch_repo, monkeypatch):
+    from concurrent.futures import Future
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    class FakeRepo:
+        enabled = True
+
+        def create_receipt_image(self, *, owner_id, description, image_bytes):
+            return "11111111-1111-1111-1111-111111111111"
+
+    class TimedOutFuture(Future):
+        def result(self, timeout=None):
+            assert timeout == 30
+            raise FutureTimeoutError()
+
+    submitted = []
+    futures = []
+
+    class FakePool:
+        def submit(self, fn, *args):
+            submitted.append(args)
+            futures.append(TimedOutFuture())
+            return futures[-1]
+
+    patch_repo(FakeRepo())
+    monkeypatch.setitem(app.extensions, "ocr_pool", (os.getpid(), FakePool()))
+
+    r = client.post(
+        "/api/receipts",
+        data={"description": "Team dinner", "image": (io.BytesIO(b"fake-image"), "receipt.png")},
+        content_type="multipart/form-data",
+    )
+
+    assert submitted == [(b"fake-image",)]
+    assert futures[0].cancelled()
+    assert r.status_code == 504
+    assert r.get_json()["error"]["code"] == "ocr_timeout"
+
+
+def test_create_receipt_replaces_broken_ocr_pool_and_retries(app, client, patch_repo, monkeypatch):
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    class FakeRepo:
+        enabled = True
+
+        def create_receipt_image(self, *, owner_id, description, image_bytes):
+            return "11111111-1111-1111-1111-111111111111"
+
+    class BrokenPool:
+        shut_down = False
+
+        def submit(self, fn, *args):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            self.shut_down = True
+
+    created = []
+
+    class FreshPool:
+        def __init__(self, *, max_workers, mp_context, initializer):
+            created.append((max_workers, mp_context.get_start_method()))
+
+        def submit(self, fn, *args):
+            future = Future()
+            future.set_result("Coffee 3.50")
+            return future
+
+    broken = BrokenPool()
+    patch_repo(FakeRepo())
+    monkeypatch.setitem(app.config, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setitem(app.extensions, "ocr_pool", (os.getpid(), broken))
+    monkeypatch.setattr(routes, "ProcessPoolExecutor", FreshPool)
+
+    r = client.post(
+        "/api/receipts",
+        data={"description": "Team dinner", "image": (io.BytesIO(b"fake-image"), "receipt.png")},
+        content_type="multipart/form-data",
+    )
+
+    assert r.status_code == 200
+    assert r.get_json()["items"] == [{"temp_id": "t0", "description": "Coffee", "price_cents": 350}]
+    assert broken.shut_down
+    assert created == [(1, "spawn")]
+    pid, pool = app.extensions["ocr_pool"]
+    assert pid == os.getpid()
+    assert isinstance(pool, FreshPool)
+
+
+def test_ocr_pool_replaces_pool_inherited_from_parent_process(app, monkeypatch):
+    class InheritedPool:
+        def submit(self, fn, *args):
+            raise AssertionError("a forked child must not submit to its parent's pool")
+
+    class FreshPool:
+        def __init__(self, *, max_workers, mp_context, initializer):
+            pass
+
+    monkeypatch.setitem(app.config, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setitem(app.extensions, "ocr_pool", (os.getpid() + 1, InheritedPool()))
+    monkeypatch.setattr(routes, "ProcessPoolExecutor", FreshPool)
+
+    pool = routes.ocr_pool(app)
+
+    assert isinstance(pool, FreshPool)
+    assert app.extensions["ocr_pool"] == (os.getpid(), pool)
+    assert routes.ocr_pool(app) is pool
+
+
+def test_create_receipt_reuses_cached_ocr_for_identical_image(client, patch_repo, monkeypatch):
+    class FakeRepo:
+        enabled = True
+
+        def create_receipt_image(self, *, owner_id, description, image_bytes):
+            return "11111111-1111-1111-1111-111111111111"
+
+    calls = []
+
+    def fake_run_ocr(image_bytes):
+        calls.append(image_bytes)
+        return "Coffee 3.50"
+
+    patch_repo(FakeRepo())
+    monkeypatch.setattr("app.services.ocr_service.run_ocr", fake_run_ocr)
+
+    responses = [
+        client.post(
+            "/api/receipts",
+            data={"description": "Team dinner", "image": (io.BytesIO(b"same-image"), "receipt.png")},
+            content_type="multipart/form-data",
+        )
+        for _ in range(2)
+    ]
+
+    assert calls == [b"same-image"]
+    assert [r.get_json()["items"] for r in responses] == [
+        [{"temp_id": "t0", "description": "Coffee", "price_cents": 350}],
+    ] * 2
+
+
 def test_replace_receipt_items_validates_payload(client):
     r = client.put("/api/receipts/11111111-1111-1111-1111-111111111111/items", json={"items": [{"description": "", "price_cents": 100}]})
     assert r.status_code == 400
     assert "description" in r.get_json()["error"]["message"].lower()
 
 
-def test_replace_receipt_items_persists_and_returns_ids(client, monkeypatch):
-    class Row:
-        def __init__(self, item_id, description, price_cents):
-            self.id = item_id
-            self.description = description
-            self.price_cents = price_cents
+def test_replace_receipt_items_rejects_malformed_json(client):
+    r = client.put(
+        "/api/receipts/11111111-1111-1111-1111-111111111111/items",
+        data=b'{"items": [',
+        content_type="application/json",
+    )
+    assert r.status_code == 400
+    assert r.get_json()["error"]["message"] == "Request body must be JSON."
 
+
+def test_replace_receipt_items_persists_and_returns_ids(client, patch_repo):
     class FakeRepo:
         enabled = True
 
         def replace_receipt_items(self, *, receipt_image_id, items):
             assert receipt_image_id == "11111111-1111-1111-1111-111111111111"
             assert [(i.description, i.price_cents) for i in items] == [("Coffee", 350)]
-            return [Row("22222222-2222-2222-2222-222222222222", "Coffee", 350)]
+            return [ReceiptItemRecord(id="22222222-2222-2222-2222-222222222222", description="Coffee", price_cents=350)]
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.put(
         "/api/receipts/11111111-1111-1111-1111-111111111111/items",
@@ -101,26 +323,19 @@ def test_replace_receipt_items_persists_and_returns_ids(client, monkeypatch):
     }
 
 
-def test_list_bills_returns_preview_cards(client, monkeypatch):
-    class BillPreview:
-        def __init__(self, receipt_image_id, bill_description, entered_at, has_image):
-            self.receipt_image_id = receipt_image_id
-            self.bill_description = bill_description
-            self.entered_at = entered_at
-            self.has_image = has_image
-
+def test_list_bills_returns_preview_cards(client, patch_repo):
     class FakeRepo:
         enabled = True
 
         def list_bill_previews(self):
             return [
-                BillPreview(
+                BillPreviewRecord(
                     "11111111-1111-1111-1111-111111111111",
                     "Uber from airport",
                     datetime(2026, 3, 2, 9, 15, tzinfo=timezone.utc),
                     True,
                 ),
-                BillPreview(
+                BillPreviewRecord(
                     "22222222-2222-2222-2222-222222222222",
                     "Grocery run",
                     datetime(2026, 3, 1, 19, 0, tzinfo=timezone.utc),
@@ -128,7 +343,7 @@ def test_list_bills_returns_preview_cards(client, monkeypatch):
                 ),
             ]
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/bills")
     assert r.status_code == 200
@@ -152,19 +367,20 @@ def test_list_bills_returns_preview_cards(client, monkeypatch):
     }
 
 
-def test_get_receipt_image_streams_blob(client, monkeypatch):
-    class Image:
-        image_blob = b"\x89PNG\r\n\x1a\nfakepng"
-        image_path = None
+def test_get_receipt_image_streams_blob(client, patch_repo):
+    image = ReceiptImageRecord(
+        image_blob=b"\x89PNG\r\n\x1a\nfakepng",
+        image_path=None,
+    )
 
     class FakeRepo:
         enabled = True
 
         def get_receipt_image(self, *, receipt_image_id):
             assert receipt_image_id == "11111111-1111-1111-1111-111111111111"
-            return Image()
+            return image
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/receipts/11111111-1111-1111-1111-111111111111/image")
     assert r.status_code == 200
@@ -172,7 +388,7 @@ def test_get_receipt_image_streams_blob(client, monkeypatch):
     assert r.data.startswith(b"\x89PNG\r\n\x1a\n")
 
 
-def test_get_receipt_image_not_found(client, monkeypatch):
+def test_get_receipt_image_not_found(client, patch_repo):
     class FakeRepo:
         enabled = True
 
@@ -180,61 +396,55 @@ def test_get_receipt_image_not_found(client, monkeypatch):
             assert receipt_image_id == "11111111-1111-1111-1111-111111111111"
             return None
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/receipts/11111111-1111-1111-1111-111111111111/image")
     assert r.status_code == 404
     assert r.get_json()["error"]["code"] == "not_found"
 
 
-def test_get_bill_split_details(client, monkeypatch):
-    class Line:
-        def __init__(self, receipt_item_id, item_description, amount_cents):
-            self.receipt_item_id = receipt_item_id
-            self.item_description = item_description
-            self.amount_cents = amount_cents
-
-    class Participant:
-        def __init__(self, participant_id, participant_name, participant_total_cents, lines):
-            self.participant_id = participant_id
-            self.participant_name = participant_name
-            self.participant_total_cents = participant_total_cents
-            self.lines = lines
-
-    class Details:
-        receipt_image_id = "11111111-1111-1111-1111-111111111111"
-        bill_description = "Lidl Wembley"
-        entered_at = datetime(2026, 3, 3, 12, 0, tzinfo=timezone.utc)
-        bill_total_cents = 247
-        has_image = True
-        participants = [
-            Participant(
+def test_get_receipt_image_rejects_non_canonical_uuid(client):
+    r = client.get("/api/receipts/11111111111111111111111111111111/image")
+    assert r.status_code == 400
+    assert r.get_json()["error"]["message"] == "Invalid receipt_image_id."
+
+
+def test_get_bill_split_details(client, patch_repo):
+    details = BillSplitDetailRecord(
+        receipt_image_id="11111111-1111-1111-1111-111111111111",
+        bill_description="Lidl Wembley",
+        entered_at=datetime(2026, 3, 3, 12, 0, tzinfo=timezone.utc),
+        bill_total_cents=247,
+        has_image=True,
+        participants=[
+            BillSplitParticipantRecord(
                 "p1",
                 "Ifham",
                 180,
                 [
-                    Line("i1", "Milk", 30),
-                    Line("i2", "Eggs", 150),
+                    BillSplitParticipantLine("i1", "Milk", 30),
+                    BillSplitParticipantLine("i2", "Eggs", 150),
                 ],
             ),
-            Participant(
+            BillSplitParticipantRecord(
                 "p2",
                 "Alice",
                 67,
                 [
-                    Line("i3", "Croissant", 67),
+                    BillSplitParticipantLine("i3", "Croissant", 67),
                 ],
             ),
-        ]
+        ],
+    )
 
     class FakeRepo:
         enabled = True
 
         def get_bill_split_detail(self, *, receipt_image_id):
             assert receipt_image_id == "11111111-1111-1111-1111-111111111111"
-            return Details()
+            return details
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/bills/11111111-1111-1111-1111-111111111111/details")
     assert r.status_code == 200
@@ -279,7 +489,7 @@ def test_get_bill_split_details(client, monkeypatch):
     }
 
 
-def test_get_bill_split_details_not_found(client, monkeypatch):
+def test_get_bill_split_details_not_found(client, patch_repo):
     class FakeRepo:
         enabled = True
 
@@ -287,27 +497,21 @@ def test_get_bill_split_details_not_found(client, monkeypatch):
             assert receipt_image_id == "11111111-1111-1111-1111-111111111111"
             return None
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/bills/11111111-1111-1111-1111-111111111111/details")
     assert r.status_code == 404
     assert r.get_json()["error"]["code"] == "not_found"
 
 
-def test_list_participants(client, monkeypatch):
-    class Row:
-        def __init__(self, participant_id, display_name, running_total_cents):
-            self.id = participant_id
-            self.display_name = display_name
-            self.running_total_cents = running_total_cents
-
+def test_list_participants(client, patch_repo):
     class FakeRepo:
         enabled = True
 
         def list_participants(self):
-            return [Row("p1", "Alice", 1000), Row("p2", "Bob", 175)]
+            return [ParticipantRecord("p1", "Alice", 1000), ParticipantRecord("p2", "Bob", 175)]
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/participants")
     assert r.status_code == 200
@@ -321,80 +525,62 @@ def test_list_participants(client, monkeypatch):
 
 
 
-def test_get_running_balances_groups_bills_and_totals(client, monkeypatch):
-    class ParticipantRow:
-        def __init__(self, participant_id, participant_name, lines, settlement_events, repayment_events):
-            self.participant_id = participant_id
-            self.participant_name = participant_name
-            self.lines = lines
-            self.settlement_events = settlement_events
-            self.repayment_events = repayment_events
-
-    class Line:
-        def __init__(self, receipt_id, bill_description, receipt_item_id, item_name, contribution_cents):
-            self.receipt_id = receipt_id
-            self.bill_description = bill_description
-            self.receipt_item_id = receipt_item_id
-            self.item_name = item_name
-            self.contribution_cents = contribution_cents
-
-    class Event:
-        def __init__(self, event_id, event_at, amount_cents, reference_details):
-            self.event_id = event_id
-            self.event_at = event_at
-            self.amount_cents = amount_cents
-            self.reference_details = reference_details
-
+def test_get_running_balances_passes_through_repository_bills_and_events(client, patch_repo):
     class FakeRepo:
         enabled = True
 
-        def list_running_balance_participants(self):
+        def list_running_balance_participants_raw(self):
             return [
-                ParticipantRow(
-                    "p-alice",
-                    "Alice",
-                    [
-                        Line("r2", "Dinner", "i2", "Steak", 1500),
-                        Line("r2", "Dinner", "i3", "Soda", 300),
-                        Line("r1", "Lunch", "i1", "Soup", 700),
+                {
+                    "participant_id": "p-alice",
+                    "participant_name": "Alice",
+                    "bills": [
+                        {
+                            "receipt_id": "r2",
+                            "bill_description": "Dinner",
+                            "bill_total_cents": 1800,
+                            "lines": [
+                                {"receipt_item_id": "i2", "item_name": "Steak", "contribution_cents": 1500},
+                                {"receipt_item_id": "i3", "item_name": "Soda", "contribution_cents": 300},
+                            ],
+                        },
+                        {
+                            "receipt_id": "r1",
+                            "bill_description": "Lunch",
+                            "bill_total_cents": 700,
+                            "lines": [
+                                {"receipt_item_id": "i1", "item_name": "Soup", "contribution_cents": 700},
+                            ],
+                        },
                     ],
-                    [
-                        Event(
-                            "settlement:s-1",
-                            datetime(2026, 1, 2, 11, 30, tzinfo=timezone.utc),
-                            200,
-                            "Bank transfer",
-                        )
+                    "active_cycle_charged_cents": 2500,
+                    "settlement_events": [
+                        {
+                            "event_id": "settlement:s-1",
+                            "event_at": "2026-01-02T11:30:00+00:00",
+                            "amount_cents": 200,
+                            "reference_details": "Bank transfer",
+                        }
                     ],
-                    [],
-                ),
-                ParticipantRow("p-bob", "Bob", [], [], []),
+                    "repayment_events": [],
+                },
+                {
+                    "participant_id": "p-bob",
+                    "participant_name": "Bob",
+                    "bills": [],
+                    "active_cycle_charged_cents": 0,
+                    "settlement_events": [],
+                    "repayment_events": [],
+                },
             ]
 
         def list_participant_folios(self):
-            class Summary:
-                def __init__(
-                    self,
-                    participant_id,
-                    total_charged_cents,
-                    total_settled_cents,
-                    total_repaid_cents,
-                    net_balance_cents,
-                    status,
-                ):
-                    self.participant_id = participant_id
-                    self.total_charged_cents = total_charged_cents
-                    self.total_settled_cents = total_settled_cents
-                    self.total_repaid_cents = total_repaid_cents
-                    self.net_balance_cents = net_balance_cents
-                    self.status = status
-
             return [
-                Summary("p-alice", 2500, 200, 0, 2300, "owes_you"),
-                Summary("p-bob", 0, 0, 0, 0, "settled"),
+                FolioSummaryRecord("p-alice", "Alice", 2500, 200, 0, 2300, "owes_you", 0),
+                FolioSummaryRecord("p-bob", "Bob", 0, 0, 0, 0, "settled", 0),
             ]
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/running-balances")
 
@@ -455,20 +641,15 @@ def test_get_running_balances_groups_bills_and_totals(client, monkeypatch):
         ]
     }
 
-def test_create_participant_returns_existing_or_new(client, monkeypatch):
-    class Row:
-        id = "22222222-2222-2222-2222-222222222222"
-        display_name = "Charlie"
-        running_total_cents = 0
-
+def test_create_participant_returns_existing_or_new(client, patch_repo):
     class FakeRepo:
         enabled = True
 
         def create_or_get_participant(self, *, display_name):
             assert display_name == "Charlie"
-            return Row()
+            return ParticipantRecord("22222222-2222-2222-2222-222222222222", "Charlie", 0)
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.post("/api/participants", json={"display_name": "Charlie"})
     assert r.status_code == 200
@@ -479,7 +660,7 @@ def test_create_participant_returns_existing_or_new(client, monkeypatch):
     }
 
 
-def test_delete_participant_blocked_when_allocations_exist(client, monkeypatch):
+def test_delete_participant_blocked_when_allocations_exist(client, patch_repo):
     class FakeRepo:
         enabled = True
 
@@ -487,24 +668,14 @@ def test_delete_participant_blocked_when_allocations_exist(client, monkeypatch):
             assert participant_id == "11111111-1111-1111-1111-111111111111"
             return True
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.delete("/api/participants/11111111-1111-1111-1111-111111111111")
     assert r.status_code == 409
     assert r.get_json()["error"]["code"] == "participant_has_allocations"
 
 
-def test_split_replaces_allocations_for_receipt(client, monkeypatch):
-    class Item:
-        def __init__(self, item_id, description, price_cents):
-            self.id = item_id
-            self.description = description
-            self.price_cents = price_cents
-
-    class Participant:
-        def __init__(self, participant_id):
-            self.id = participant_id
-
+def test_split_replaces_allocations_for_receipt(client, patch_repo):
     captured = {}
 
     class FakeRepo:
@@ -513,8 +684,8 @@ def test_split_replaces_allocations_for_receipt(client, monkeypatch):
         def get_receipt_items(self, *, receipt_image_id):
             assert receipt_image_id == "11111111-1111-1111-1111-111111111111"
             return [
-                Item("aaaaaaa1-1111-1111-1111-111111111111", "Coffee", 350),
-                Item("aaaaaaa2-1111-1111-1111-111111111111", "Sandwich", 825),
+                ReceiptItemRecord("aaaaaaa1-1111-1111-1111-111111111111", "Coffee", 350),
+                ReceiptItemRecord("aaaaaaa2-1111-1111-1111-111111111111", "Sandwich", 825),
             ]
 
         def get_participants_by_ids(self, *, participant_ids):
@@ -522,13 +693,13 @@ def test_split_replaces_allocations_for_receipt(client, monkeypatch):
                 "22222222-2222-2222-2222-222222222222",
                 "33333333-3333-3333-3333-333333333333",
             ]
-            return [Participant(pid) for pid in participant_ids]
+            return [ParticipantRecord(pid, "", 0) for pid in participant_ids]
 
         def replace_allocations_for_receipt(self, *, receipt_image_id, allocations):
             captured["receipt_image_id"] = receipt_image_id
-            captured["allocations"] = list(allocations)
+            captured["allocations"] = allocations
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     payload = {
         "participants": [
@@ -558,66 +729,167 @@ def test_split_replaces_allocations_for_receipt(client, monkeypatch):
         {"id": "aaaaaaa2-1111-1111-1111-111111111111", "description": "Sandwich"},
     ]
     assert captured["receipt_image_id"] == "11111111-1111-1111-1111-111111111111"
-    assert len(captured["allocations"]) == 3
-
+    assert captured["allocations"] == [
+        ItemAllocation("22222222-2222-2222-2222-222222222222", "aaaaaaa1-1111-1111-1111-111111111111", 175),
+        ItemAllocation("33333333-3333-3333-3333-333333333333", "aaaaaaa1-1111-1111-1111-111111111111", 175),
+        ItemAllocation("22222222-2222-2222-2222-222222222222", "aaaaaaa2-1111-1111-1111-111111111111", 825),
+    ]
 
-def test_split_rejects_assignment_for_foreign_item(client, monkeypatch):
-    class Item:
-        id = "aaaaaaa1-1111-1111-1111-111111111111"
-        description = "Coffee"
-        price_cents = 350
 
+def test_split_rejects_assignment_for_foreign_item(client, patch_repo):
     class FakeRepo:
         enabled = True
 
         def get_receipt_items(self, *, receipt_image_id):
-            return [Item()]
+            return [ReceiptItemRecord("aaaaaaa1-1111-1111-1111-111111111111", "Coffee", 350)]
 
         def get_participants_by_ids(self, *, participant_ids):
             return []
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     payload = {
         "participants": ["22222222-2222-2222-2222-222222222222"],
         "assignments": {
             "aaaaaaa9-1111-1111-1111-111111111111": ["22222222-2222-2222-2222-222222222222"],
+            "aaaaaaa8-1111-1111-1111-111111111111": ["22222222-2222-2222-2222-222222222222"],
+            "aaaaaaa7-1111-1111-1111-111111111111": ["22222222-2222-2222-2222-222222222222"],
+        },
+    }
+
+    # Sent pre-encoded: the test client's JSON encoder would sort the keys.
+    r = client.post(
+        "/api/receipts/11111111-1111-1111-1111-111111111111/split",
+        data=json.dumps(payload),
+        content_type="application/json",
+    )
+    assert r.status_code == 400
+    assert r.get_json()["error"]["message"] == (
+        "Assignment references unknown item id for this receipt: aaaaaaa9-1111-1111-1111-111111111111"
+    )
+
+
+def test_split_rejects_item_without_assignment(client, patch_repo):
+    class FakeRepo:
+        enabled = True
+
+        def get_receipt_items(self, *, receipt_image_id):
+            return [
+                ReceiptItemRecord("aaaaaaa1-1111-1111-1111-111111111111", "Coffee", 350),
+                ReceiptItemRecord("aaaaaaa2-1111-1111-1111-111111111111", "Coffee", 825),
+            ]
+
+        def get_participants_by_ids(self, *, participant_ids):
+            return [ParticipantRecord("22222222-2222-2222-2222-222222222222", "Alice", 0)]
+
+    patch_repo(FakeRepo())
+
+    payload = {
+        "participants": ["22222222-2222-2222-2222-222222222222"],
+        "assignments": {
+            "aaaaaaa1-1111-1111-1111-111111111111": ["22222222-2222-2222-2222-222222222222"],
+        },
+    }
+
+    r = client.post("/api/receipts/11111111-1111-1111-1111-111111111111/split", json=payload)
+    assert r.status_code == 400
+    assert r.get_json()["error"]["message"] == (
+        "Assignment for item aaaaaaa2-1111-1111-1111-111111111111 must be a non-empty list."
+    )
+
+
+def test_split_rejects_empty_assignment_before_participant_lookup(client, patch_repo):
+    class FakeRepo:
+        enabled = True
+
+        def get_receipt_items(self, *, receipt_image_id):
+            return [
+                ReceiptItemRecord("aaaaaaa1-1111-1111-1111-111111111111", "Coffee", 350),
+                ReceiptItemRecord("aaaaaaa2-1111-1111-1111-111111111111", "Coffee", 825),
+            ]
+
+        def get_participants_by_ids(self, *, participant_ids):
+            return []
+
+    patch_repo(FakeRepo())
+
+    payload = {
+        "participants": ["22222222-2222-2222-2222-222222222222"],
+        "assignments": {
+            "aaaaaaa1-1111-1111-1111-111111111111": ["22222222-2222-2222-2222-222222222222"],
+            "aaaaaaa2-1111-1111-1111-111111111111": [],
         },
     }
 
     r = client.post("/api/receipts/11111111-1111-1111-1111-111111111111/split", json=payload)
     assert r.status_code == 400
-    assert "unknown item" in r.get_json()["error"]["message"].lower()
+    assert r.get_json()["error"]["message"] == (
+        "Assignment for item aaaaaaa2-1111-1111-1111-111111111111 must be a non-empty list."
+    )
+
+
+@pytest.mark.parametrize(
+    ("selected", "message"),
+    [
+        (["not-a-uuid"], "contains invalid participant id."),
+        ([7], "contains invalid participant id."),
+        ([["22222222-2222-2222-2222-222222222222"]], "contains invalid participant id."),
+        (["33333333-3333-3333-3333-333333333333"], "references participant not in request 'participants'."),
+        (
+            ["22222222-2222-2222-2222-222222222222", "22222222-2222-2222-2222-222222222222"],
+            "contains duplicate participant ids.",
+        ),
+    ],
+)
+def test_split_rejects_bad_assigned_participant_ids(client, patch_repo, selected, message):
+    class FakeRepo:
+        enabled = True
+
+        def get_receipt_items(self, *, receipt_image_id):
+            return [ReceiptItemRecord("aaaaaaa1-1111-1111-1111-111111111111", "Coffee", 350)]
+
+        def get_participants_by_ids(self, *, participant_ids):
+            return [ParticipantRecord("22222222-2222-2222-2222-222222222222", "Alice", 0)]
 
+    patch_repo(FakeRepo())
 
-def test_get_participant_ledger_groups_lines_and_computes_total(client, monkeypatch):
-    class Participant:
-        id = "22222222-2222-2222-2222-222222222222"
+    payload = {
+        "participants": ["22222222-2222-2222-2222-222222222222"],
+        "assignments": {"aaaaaaa1-1111-1111-1111-111111111111": selected},
+    }
+
+    r = client.post("/api/receipts/11111111-1111-1111-1111-111111111111/split", json=payload)
+    assert r.status_code == 400
+    assert r.get_json()["error"]["message"] == f"Assignment for item aaaaaaa1-1111-1111-1111-111111111111 {message}"
 
-    class LedgerLine:
-        def __init__(self, receipt_image_id, bill_description, receipt_item_id, item_description, amount_cents):
-            self.receipt_image_id = receipt_image_id
-            self.bill_description = bill_description
-            self.receipt_item_id = receipt_item_id
-            self.item_description = item_description
-            self.amount_cents = amount_cents
 
+def test_get_participant_ledger_passes_through_repository_bills_and_total(client, patch_repo):
     class FakeRepo:
         enabled = True
 
         def get_participants_by_ids(self, *, participant_ids):
             assert participant_ids == ["22222222-2222-2222-2222-222222222222"]
-            return [Participant()]
+            return [ParticipantRecord("22222222-2222-2222-2222-222222222222", "Alice", 0)]
 
-        def get_participant_ledger_lines(self, *, participant_id):
+        def get_participant_ledger_bills_raw(self, *, participant_id):
             assert participant_id == "22222222-2222-2222-2222-222222222222"
-            return [
-                LedgerLine("r2", "Dinner", "i2", "Steak", 1500),
-                LedgerLine("r2", "Dinner", "i3", "Soda", 300),
-                LedgerLine("r1", "Lunch", "i1", "Soup", 700),
+            return 2500, [
+                {
+                    "receipt_image_id": "r2",
+                    "bill_description": "Dinner",
+                    "lines": [
+                        {"receipt_item_id": "i2", "item_description": "Steak", "amount_cents": 1500},
+                        {"receipt_item_id": "i3", "item_description": "Soda", "amount_cents": 300},
+                    ],
+                },
+                {
+                    "receipt_image_id": "r1",
+                    "bill_description": "Lunch",
+                    "lines": [{"receipt_item_id": "i1", "item_description": "Soup", "amount_cents": 700}],
+                },
             ]
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/participants/22222222-2222-2222-2222-222222222222/ledger")
     assert r.status_code == 200
@@ -642,28 +914,17 @@ def test_get_participant_ledger_groups_lines_and_computes_total(client, monkeypa
     }
 
 
-def test_list_participant_folios(client, monkeypatch):
-    class Summary:
-        def __init__(self, participant_id, display_name, charged, settled, repaid, net, status, overpayment):
-            self.participant_id = participant_id
-            self.display_name = display_name
-            self.total_charged_cents = charged
-            self.total_settled_cents = settled
-            self.total_repaid_cents = repaid
-            self.net_balance_cents = net
-            self.status = status
-            self.overpayment_cents = overpayment
-
+def test_list_participant_folios(client, patch_repo):
     class FakeRepo:
         enabled = True
 
         def list_participant_folios(self):
             return [
-                Summary("p1", "Alice", 1000, 400, 0, 600, "owes_you", 0),
-                Summary("p2", "Bob", 1000, 1300, 200, -100, "you_owe_them", 100),
+                FolioSummaryRecord("p1", "Alice", 1000, 400, 0, 600, "owes_you", 0),
+                FolioSummaryRecord("p2", "Bob", 1000, 1300, 200, -100, "you_owe_them", 100),
             ]
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/participants/folios")
     assert r.status_code == 200
@@ -693,33 +954,22 @@ def test_list_participant_folios(client, monkeypatch):
     }
 
 
-def test_get_participant_folio_returns_event_history(client, monkeypatch):
-    class Summary:
-        participant_id = "22222222-2222-2222-2222-222222222222"
-        display_name = "Alice"
-        total_charged_cents = 1000
-        total_settled_cents = 400
-        total_repaid_cents = 0
-        net_balance_cents = 600
-        status = "owes_you"
-        overpayment_cents = 0
-
-    class Event:
-        def __init__(self, event_id, event_at, event_type, amount_cents, prev_net, new_net, ref):
-            self.event_id = event_id
-            self.event_at = event_at
-            self.event_type = event_type
-            self.amount_cents = amount_cents
-            self.previous_net_balance_cents = prev_net
-            self.new_net_balance_cents = new_net
-            self.reference_details = ref
-            self.receipt_image_id = "r1" if event_type == "charge" else None
-            self.receipt_item_id = "i1" if event_type == "charge" else None
-
-    class Folio:
-        summary = Summary()
-        charge_events = [
-            Event(
+def test_get_participant_folio_returns_event_history(client, patch_repo):
+    summary = FolioSummaryRecord(
+        participant_id="22222222-2222-2222-2222-222222222222",
+        display_name="Alice",
+        total_charged_cents=1000,
+        total_settled_cents=400,
+        total_repaid_cents=0,
+        net_balance_cents=600,
+        status="owes_you",
+        overpayment_cents=0,
+    )
+
+    folio = FolioDetailRecord(
+        summary=summary,
+        charge_events=[
+            FolioEventRecord(
                 "evt-charge-1",
                 datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc),
                 "charge",
@@ -727,10 +977,12 @@ def test_get_participant_folio_returns_event_history(client, monkeypatch):
                 0,
                 1000,
                 "Dinner | Pasta",
+                "r1",
+                "i1",
             )
-        ]
-        settlement_events = [
-            Event(
+        ],
+        settlement_events=[
+            FolioEventRecord(
                 "evt-settle-1",
                 datetime(2026, 1, 2, 11, 30, tzinfo=timezone.utc),
                 "settlement",
@@ -738,9 +990,12 @@ def test_get_participant_folio_returns_event_history(client, monkeypatch):
                 1000,
                 600,
                 "Bank transfer",
+                None,
+                None,
             )
-        ]
-        repayment_events = []
+        ],
+        repayment_events=[],
+    )
 
     class FakeRepo:
         enabled = True
@@ -748,9 +1003,9 @@ def test_get_participant_folio_returns_event_history(client, monkeypatch):
         def get_participant_folio(self, *, participant_id, max_events):
             assert participant_id == "22222222-2222-2222-2222-222222222222"
             assert max_events == 100
-            return Folio()
+            return folio
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.get("/api/participants/22222222-2222-2222-2222-222222222222/folio")
     assert r.status_code == 200
@@ -797,24 +1052,25 @@ def test_get_participant_folio_returns_event_history(client, monkeypatch):
     }
 
 
-def test_create_settlement_exact_paydown(client, monkeypatch):
-    class Result:
-        settlement_id = "s1"
-        previous_net_balance_cents = 1000
-        settlement_amount_cents = 1000
-        new_net_balance_cents = 0
-        status = "settled"
-        overpayment_cents = 0
-        idempotency_replayed = False
+def test_create_settlement_exact_paydown(client, patch_repo):
+    result = SettlementCreateResult(
+        settlement_id="s1",
+        previous_net_balance_cents=1000,
+        settlement_amount_cents=1000,
+        new_net_balance_cents=0,
+        status="settled",
+        overpayment_cents=0,
+        idempotency_replayed=False,
+    )
 
     class FakeRepo:
         enabled = True
 
         def create_participant_settlement(self, **kwargs):
             assert kwargs["amount_cents"] == 1000
-            return Result()
+            return result
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.post(
         "/api/participants/22222222-2222-2222-2222-222222222222/settlements",
@@ -826,24 +1082,25 @@ def test_create_settlement_exact_paydown(client, monkeypatch):
     assert r.get_json()["overpayment_happened"] is False
 
 
-def test_create_settlement_partial_paydown(client, monkeypatch):
-    class Result:
-        settlement_id = "s2"
-        previous_net_balance_cents = 1000
-        settlement_amount_cents = 400
-        new_net_balance_cents = 600
-        status = "owes_you"
-        overpayment_cents = 0
-        idempotency_replayed = False
+def test_create_settlement_partial_paydown(client, patch_repo):
+    result = SettlementCreateResult(
+        settlement_id="s2",
+        previous_net_balance_cents=1000,
+        settlement_amount_cents=400,
+        new_net_balance_cents=600,
+        status="owes_you",
+        overpayment_cents=0,
+        idempotency_replayed=False,
+    )
 
     class FakeRepo:
         enabled = True
 
         def create_participant_settlement(self, **kwargs):
             assert kwargs["amount_cents"] == 400
-            return Result()
+            return result
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.post(
         "/api/participants/22222222-2222-2222-2222-222222222222/settlements",
@@ -855,24 +1112,25 @@ def test_create_settlement_partial_paydown(client, monkeypatch):
     assert r.get_json()["status"] == "owes_you"
 
 
-def test_create_settlement_overpayment(client, monkeypatch):
-    class Result:
-        settlement_id = "s3"
-        previous_net_balance_cents = 1000
-        settlement_amount_cents = 1300
-        new_net_balance_cents = -300
-        status = "you_owe_them"
-        overpayment_cents = 300
-        idempotency_replayed = False
+def test_create_settlement_overpayment(client, patch_repo):
+    result = SettlementCreateResult(
+        settlement_id="s3",
+        previous_net_balance_cents=1000,
+        settlement_amount_cents=1300,
+        new_net_balance_cents=-300,
+        status="you_owe_them",
+        overpayment_cents=300,
+        idempotency_replayed=False,
+    )
 
     class FakeRepo:
         enabled = True
 
         def create_participant_settlement(self, **kwargs):
             assert kwargs["amount_cents"] == 1300
-            return Result()
+            return result
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.post(
         "/api/participants/22222222-2222-2222-2222-222222222222/settlements",
@@ -885,24 +1143,25 @@ def test_create_settlement_overpayment(client, monkeypatch):
     assert r.get_json()["overpayment_happened"] is True
 
 
-def test_create_settlement_duplicate_idempotency_key_is_replayed(client, monkeypatch):
-    class Result:
-        settlement_id = "s4"
-        previous_net_balance_cents = 1000
-        settlement_amount_cents = 400
-        new_net_balance_cents = 600
-        status = "owes_you"
-        overpayment_cents = 0
-        idempotency_replayed = True
+def test_create_settlement_duplicate_idempotency_key_is_replayed(client, patch_repo):
+    result = SettlementCreateResult(
+        settlement_id="s4",
+        previous_net_balance_cents=1000,
+        settlement_amount_cents=400,
+        new_net_balance_cents=600,
+        status="owes_you",
+        overpayment_cents=0,
+        idempotency_replayed=True,
+    )
 
     class FakeRepo:
         enabled = True
 
         def create_participant_settlement(self, **kwargs):
             assert kwargs["idempotency_key"] == "idem-abc"
-            return Result()
+            return result
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.post(
         "/api/participants/22222222-2222-2222-2222-222222222222/settlements",
@@ -913,15 +1172,16 @@ def test_create_settlement_duplicate_idempotency_key_is_replayed(client, monkeyp
     assert r.get_json()["settlement_amount_cents"] == 400
 
 
-def test_reverse_settlement_behavior(client, monkeypatch):
-    class Result:
-        settlement_id = "44444444-4444-4444-4444-444444444444"
-        previous_net_balance_cents = -300
-        reversed_settlement_amount_cents = 1300
-        new_net_balance_cents = 1000
-        status = "owes_you"
-        overpayment_cents = 0
-        reversal_applied = True
+def test_reverse_settlement_behavior(client, patch_repo):
+    result = SettlementReverseResult(
+        settlement_id="44444444-4444-4444-4444-444444444444",
+        previous_net_balance_cents=-300,
+        reversed_settlement_amount_cents=1300,
+        new_net_balance_cents=1000,
+        status="owes_you",
+        overpayment_cents=0,
+        reversal_applied=True,
+    )
 
     class FakeRepo:
         enabled = True
@@ -929,9 +1189,9 @@ def test_reverse_settlement_behavior(client, monkeypatch):
         def reverse_participant_settlement(self, **kwargs):
             assert kwargs["participant_id"] == "22222222-2222-2222-2222-222222222222"
             assert kwargs["settlement_id"] == "44444444-4444-4444-4444-444444444444"
-            return Result()
+            return result
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.post(
         "/api/participants/22222222-2222-2222-2222-222222222222/settlements/44444444-4444-4444-4444-444444444444/reverse",
@@ -959,24 +1219,25 @@ def test_create_settlement_invalid_payload_returns_400(client):
     assert "amount_cents" in r.get_json()["error"]["message"]
 
 
-def test_create_repayment(client, monkeypatch):
-    class Result:
-        repayment_id = "repay-1"
-        previous_net_balance_cents = -300
-        repayment_amount_cents = 300
-        new_net_balance_cents = 0
-        status = "settled"
-        overpayment_cents = 0
-        idempotency_replayed = False
+def test_create_repayment(client, patch_repo):
+    result = RepaymentCreateResult(
+        repayment_id="repay-1",
+        previous_net_balance_cents=-300,
+        repayment_amount_cents=300,
+        new_net_balance_cents=0,
+        status="settled",
+        overpayment_cents=0,
+        idempotency_replayed=False,
+    )
 
     class FakeRepo:
         enabled = True
 
         def create_participant_repayment(self, **kwargs):
             assert kwargs["amount_cents"] == 300
-            return Result()
+            return result
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.post(
         "/api/participants/22222222-2222-2222-2222-222222222222/repayments",
@@ -995,15 +1256,16 @@ def test_create_repayment(client, monkeypatch):
     }
 
 
-def test_reverse_repayment(client, monkeypatch):
-    class Result:
-        repayment_id = "repay-1"
-        previous_net_balance_cents = 0
-        reversed_repayment_amount_cents = 300
-        new_net_balance_cents = -300
-        status = "you_owe_them"
-        overpayment_cents = 300
-        reversal_applied = True
+def test_reverse_repayment(client, patch_repo):
+    result = RepaymentReverseResult(
+        repayment_id="repay-1",
+        previous_net_balance_cents=0,
+        reversed_repayment_amount_cents=300,
+        new_net_balance_cents=-300,
+        status="you_owe_them",
+        overpayment_cents=300,
+        reversal_applied=True,
+    )
 
     class FakeRepo:
         enabled = True
@@ -1011,9 +1273,9 @@ def test_reverse_repayment(client, monkeypatch):
         def reverse_participant_repayment(self, **kwargs):
             assert kwargs["participant_id"] == "22222222-2222-2222-2222-222222222222"
             assert kwargs["repayment_id"] == "55555555-5555-5555-5555-555555555555"
-            return Result()
+            return result
 
-    monkeypatch.setattr("app.api.routes._repo", lambda: FakeRepo())
+    patch_repo(FakeRepo())
 
     r = client.post(
         "/api/participants/22222222-2222-2222-2222-222222222222/repayments/55555555-5555-5555-5555-555555555555/reverse",
@@ -23,6 +23,19 @@ def test_parse_usd_to_cents_trailing_dash_negative():
     assert parse_usd_to_cents("$0.99-") == -99
 
 
+def test_parse_usd_to_cents_applies_limits_per_call_for_repeated_tokens():
+    assert parse_usd_to_cents("7.50-") == -750
+    with pytest.raises(MoneyError):
+        parse_usd_to_cents("7.50-", allow_negative=False)
+    with pytest.raises(MoneyError):
+        parse_usd_to_cents("7.50-", max_abs_cents=500)
+
+
+def test_parse_usd_to_cents_allows_spaces_around_symbol_and_dash():
+    assert parse_usd_to_cents(" $ 12.34 - ") == -1234
+    assert parse_usd_to_cents("$\t7") == 700
+
+
 def test_parse_usd_to_cents_rejects_thousands_separator_to_avoid_guessing():
     with pytest.raises(MoneyError):
         parse_usd_to_cents("1,234.56")
@@ -31,7 +44,7 @@ def test_parse_usd_to_cents_rejects_thousands_separator_to_avoid_guessing():
 
 
 def test_parse_usd_to_cents_rejects_invalid_tokens():
-    for bad in ["", "abc", "$", "12..34", "12.345", "12,3,4", "-12.34"]:
+    for bad in ["", "abc", "$", "12..34", "12.345", "12,3,4", "-12.34", "12 .34", "1.2-3", "12345678", "$-"]:
         with pytest.raises(MoneyError):
             parse_usd_to_cents(bad)
 
@@ -1,4 +1,8 @@
-from app.repositories.repository import compute_folio_metrics, folio_status_from_net_balance
+from app.repositories.repository import (
+    SplitItRepository,
+    compute_folio_metrics,
+    folio_status_from_net_balance,
+)
 
 
 def test_compute_folio_metrics_partial_paydown():
@@ -33,3 +37,62 @@ def test_folio_status_from_net_balance():
     assert folio_status_from_net_balance(1) == "owes_you"
     assert folio_status_from_net_balance(0) == "settled"
     assert folio_status_from_net_balance(-1) == "you_owe_them"
+
+
+def test_parse_running_balance_event_dicts_normalizes_event_at_and_keeps_order():
+    # Postgres trims trailing fractional-second zeros in JSON timestamps.
+    events_json = (
+        '[{"event_id": "settlement:s-2", "event_at": "2026-01-03T12:00:00.5+00:00",'
+        ' "amount_cents": 300, "reference_details": "Cash"},'
+        ' {"event_id": "settlement:s-1", "event_at": "2026-01-02T11:30:00+00:00",'
+        ' "amount_cents": 200, "reference_details": ""}]'
+    )
+
+    assert SplitItRepository._parse_running_balance_event_dicts(events_json) == [
+        {
+            "event_id": "settlement:s-2",
+            "event_at": "2026-01-03T12:00:00.500000+00:00",
+            "amount_cents": 300,
+            "reference_details": "Cash",
+        },
+        {
+            "event_id": "settlement:s-1",
+            "event_at": "2026-01-02T11:30:00+00:00",
+            "amount_cents": 200,
+            "reference_details": "",
+        },
+    ]
+
+
+def test_parse_running_balance_event_dicts_empty_array():
+    assert SplitItRepository._parse_running_balance_event_dicts("[]") == []
+
+
+def test_map_ledger_bills_row_decodes_bills_in_order():
+    row = (
+        1175,
+        '[{"receipt_image_id": "r2", "bill_description": "Dinner", "lines":'
+        ' [{"receipt_item_id": "i2", "item_description": "Burger", "amount_cents": 825}]},'
+        ' {"receipt_image_id": "r1", "bill_description": "Lunch", "lines":'
+        ' [{"receipt_item_id": "i1", "item_description": "Coffee", "amount_cents": 350}]}]',
+    )
+
+    assert SplitItRepository._map_ledger_bills_row(row) == (
+        1175,
+        [
+            {
+                "receipt_image_id": "r2",
+                "bill_description": "Dinner",
+                "lines": [{"receipt_item_id": "i2", "item_description": "Burger", "amount_cents": 825}],
+            },
+            {
+                "receipt_image_id": "r1",
+                "bill_description": "Lunch",
+                "lines": [{"receipt_item_id": "i1", "item_description": "Coffee", "amount_cents": 350}],
+            },
+        ],
+    )
+
+
+def test_map_ledger_bills_row_without_allocations():
+    assert SplitItRepository._map_ledger_bills_row((0, "[]")) == (0, [])
@@ -5,6 +5,7 @@ from app.domain.split_logic import (
     Allocation,
     SplitLogicError,
     add_allocation_to_totals,
+    fair_remainder_amounts,
     split_cents_fair_remainder,
     split_cents_penny_perfect,
     split_items_and_sum,
@@ -69,6 +70,26 @@ def test_fair_remainder_uses_participant_order_for_ties():
     assert alloc.amounts_cents == (1, 0)
 
 
+def test_fair_remainder_can_give_several_cents_to_one_participant():
+    running_totals = {"a": 50, "b": 50, "c": 50, "d": 0}
+    participant_order = {"a": 0, "b": 1, "c": 2, "d": 3}
+
+    alloc = split_cents_fair_remainder(3, ["a", "b", "c", "d"], running_totals, participant_order)
+
+    # base=0 and d trails by far, so every remainder cent lands on d
+    assert alloc.amounts_cents == (0, 0, 0, 3)
+
+
+def test_fair_remainder_amounts_matches_validated_split():
+    running_totals = {"a": 100, "b": 10, "c": 10}
+    participant_order = {"a": 0, "b": 1, "c": 2}
+
+    amounts = fair_remainder_amounts(5, ["a", "b", "c"], running_totals, participant_order)
+
+    assert amounts == [1, 2, 2]
+    assert tuple(amounts) == split_cents_fair_remainder(5, ["a", "b", "c"], running_totals, participant_order).amounts_cents
+
+
 def test_invalid_total_type_raises():
     with pytest.raises(SplitLogicError):
         split_cents_penny_perfect("100", ["a", "b"])  # type: ignore[arg-type]